@@ -0,0 +1,249 @@
+"""
+Generator throughput benchmark on synthetic stub spaces.
+
+Builds synthetic `apistubs.yaml`, an application calling every stubbed
+route and a `GenTestCase` in a temporary directory, runs the generator
+and reports JSON results:
+
+    $ python benchmarks/bench_generator.py > results.json
+    $ python benchmarks/bench_generator.py --services 4 --paths 50 --variants 3
+
+Every configuration runs in a separate process, so peak memory is
+reported per configuration.
+"""
+
+import argparse
+import copy
+import io
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import yaml
+
+PRESETS = [
+    {'services': 1, 'paths': 10, 'calls': 2, 'variants': 3, 'param_density': 0.5},
+    {'services': 3, 'paths': 50, 'calls': 2, 'variants': 3, 'param_density': 0.5},
+    {'services': 5, 'paths': 200, 'calls': 1, 'variants': 3, 'param_density': 0.5},
+    {'services': 2, 'paths': 500, 'calls': 2, 'variants': 3, 'param_density': 1.0},
+]
+
+# variants cycle through statuses, the synthetic app stops on 5xx
+STATUSES = [200, 404, 500]
+
+APP_TEMPLATE = '''
+import requests
+
+CALLS = {calls!r}
+STOP_ON_ERROR = {stop_on_error!r}
+
+
+def main():
+    for url in CALLS:
+        response = requests.get(url)
+        if STOP_ON_ERROR and response.status_code >= 500:
+            return
+'''
+
+CASE_TEMPLATE = '''
+from apitests import points
+from apitests.base import GenTestCase
+from apitests.generator.stubgen import StubsGenMixin
+
+from bench_app import main
+
+# the pause before the repeat pass is not generator work
+StubsGenMixin.doublerun_delay = 0
+
+
+class TestBench(GenTestCase):
+    feature = 'bench'
+    stubs = {stubs!r}
+    external_services = {external_services!r}
+    initials = [points.Process('handle')]
+    max_tests = {max_tests!r}
+    generator_workers = {workers!r}
+    interleave_gen_doublerun = {interleave!r}
+
+    def handle(self, workflow):
+        main()
+'''
+
+
+def build_space(base_path, services, paths, calls, variants, param_density, stop_on_error=True):
+    stubs = {'apistubs': '1.0.0'}
+    external_services = {}
+    urls = []
+    for service_index in range(services):
+        service = f'svc{service_index}'
+        host = f'{service}.bench'
+        external_services[host] = service
+        stubs[service] = {}
+        with_params = int(paths * param_density)
+        for path_index in range(paths):
+            if path_index < with_params:
+                pattern = f'/api/{path_index}/items/{{item_id}}'
+                path = f'/api/{path_index}/items/{path_index * 7}'
+            else:
+                pattern = f'/api/{path_index}/items'
+                path = pattern
+            stubs[service][f'get#{pattern}'] = {
+                f'{STATUSES[variant % len(STATUSES)]}-v{variant}': {
+                    'id': path_index, 'variant': variant, 'items': list(range(5)),
+                }
+                for variant in range(variants)
+            }
+            if path_index < calls:
+                urls.append(f'https://{host}{path}')
+
+    stubs_path = os.path.join(base_path, 'apistubs.yaml')
+    with open(stubs_path, 'w') as stubs_file:
+        stubs_file.write(yaml.safe_dump(stubs, sort_keys=False))
+
+    with open(os.path.join(base_path, 'bench_app.py'), 'w') as app_file:
+        app_file.write(APP_TEMPLATE.format(calls=urls, stop_on_error=stop_on_error))
+
+    return stubs_path, external_services
+
+
+def run_single(config):
+    with tempfile.TemporaryDirectory(prefix='apitests-bench-') as base_path:
+        return run_in_directory(config, base_path)
+
+
+def run_in_directory(config, base_path):
+    stubs_path, external_services = build_space(
+        base_path, config['services'], config['paths'], config['calls'],
+        config['variants'], config['param_density'], config.get('stop_on_error', True)
+    )
+    with open(os.path.join(base_path, 'bench_case.py'), 'w') as case_file:
+        case_file.write(CASE_TEMPLATE.format(
+            stubs=stubs_path, external_services=external_services,
+            max_tests=config.get('max_tests', 1000), workers=config.get('workers', 1),
+            interleave=config.get('interleave', False),
+        ))
+
+    sys.path.insert(0, base_path)
+    sys.argv.append('-m=generator')
+
+    from apitests.generator import fold_pipeline, normilize_pipeline
+
+    import bench_case
+
+    result = {'config': config}
+    test_case = bench_case.TestBench
+    save_tests = test_case.save_tests.__func__
+
+    def generator_tear_down_class(cls):
+        result['generation_seconds'] = time.perf_counter() - started
+        data = copy.deepcopy(cls.pipelines.get(cls.get_pipelines_key(0), []))
+        data_repeated = copy.deepcopy(cls.pipelines.get(cls.get_pipelines_key(1), []))
+        result['pipelines'] = len(data)
+        result['runs'] = len(data) + len(data_repeated)
+        data = dict(data)
+        data_repeated = dict(data_repeated)
+
+        start = time.perf_counter()
+        data = normilize_pipeline(data, data_repeated=data_repeated, use_set_pattern=False)
+        result['normilize_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fold_pipeline(data)
+        result['fold_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        save_tests(cls)
+        result['save_seconds'] = time.perf_counter() - start
+
+    test_case.generator_tear_down_class = classmethod(generator_tear_down_class)
+
+    suite = unittest.defaultTestLoader.loadTestsFromTestCase(test_case)
+    started = time.perf_counter()
+    outcome = unittest.TextTestRunner(stream=io.StringIO()).run(suite)
+
+    result['errors'] = len(outcome.errors) + len(outcome.failures)
+    result['combinations_per_second'] = (
+        result.get('runs', 0) / result['generation_seconds']
+        if result.get('generation_seconds') else None
+    )
+    if resource is not None:
+        # kilobytes on Linux
+        result['peak_memory_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+
+def run_matrix(configs):
+    results = []
+    for config in configs:
+        output = subprocess.run(
+            [sys.executable, __file__, '--single', json.dumps(config)],
+            check=True, stdout=subprocess.PIPE,
+        ).stdout
+        results.append(json.loads(output))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--services', type=int, nargs='*')
+    parser.add_argument('--paths', type=int, nargs='*')
+    parser.add_argument('--calls', type=int, nargs='*')
+    parser.add_argument('--variants', type=int, nargs='*')
+    parser.add_argument('--param-density', type=float, nargs='*')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--interleave', action='store_true')
+    parser.add_argument('--max-tests', type=int, default=1000)
+    parser.add_argument('--output')
+    parser.add_argument('--single', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        with redirect_stdout(io.StringIO()):
+            result = run_single(json.loads(args.single))
+        sys.stdout.write(json.dumps(result))
+        return
+
+    axes = {
+        'services': args.services,
+        'paths': args.paths,
+        'calls': args.calls,
+        'variants': args.variants,
+        'param_density': args.param_density,
+    }
+    if any(axes.values()):
+        base = PRESETS[0]
+        values = [axes[name] or [base[name]] for name in axes]
+        configs = [dict(zip(axes, combination)) for combination in itertools.product(*values)]
+    else:
+        configs = copy.deepcopy(PRESETS)
+
+    for config in configs:
+        config.update({
+            'workers': args.workers,
+            'interleave': args.interleave,
+            'max_tests': args.max_tests,
+        })
+
+    from apitests import VERSION
+
+    report = json.dumps({'version': VERSION, 'results': run_matrix(configs)}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(report)
+    else:
+        sys.stdout.write(report + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Import-time benchmark of replay mode.
+
+Measures `from apitests.base import WorkflowTestCase` in fresh processes
+and checks that generator, serialization and LLM modules (and their
+dependencies) are not loaded by it. Exits with status 1 when they are:
+
+    $ python benchmarks/bench_import.py
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+LAZY_MODULES = [
+    'apitests.generator',
+    'apitests.generative',
+    'apitests.helpers',
+    'apitests.serialization',
+    'apitests.contrib.gemini',
+    'aiohttp',
+    'deepdiff',
+    'httpcore',
+    'jinja2',
+    'uncurl',
+]
+
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+from apitests.base import WorkflowTestCase
+seconds = time.perf_counter() - started
+lazy = {lazy!r}
+loaded = sorted(m for m in sys.modules if any(m == name or m.startswith(name + '.') for name in lazy))
+sys.stdout.write(json.dumps({{'seconds': seconds, 'modules': len(sys.modules), 'loaded': loaded}}))
+'''
+
+
+def run_probe():
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(lazy=LAZY_MODULES)],
+        check=True, stdout=subprocess.PIPE,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    probes = [run_probe() for _ in range(args.repeat)]
+    seconds = [probe['seconds'] for probe in probes]
+    result = {
+        'median_seconds': statistics.median(seconds),
+        'min_seconds': min(seconds),
+        'modules': probes[0]['modules'],
+        'unexpected_modules': probes[0]['loaded'],
+    }
+    sys.stdout.write(json.dumps(result, indent=2) + '\n')
+    if result['unexpected_modules']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
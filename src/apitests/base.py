@@ -2,14 +2,14 @@
 Base TestCase classes:
 GenTestCase - for generator;
 WorkflowTestCase - for handle generated tests.
-"""
 
-import os
-import sys
+Generator classes are loaded lazily, replay doesn't import the generator.
+"""
 
 from . import settings
 from .mixins import WorkflowTestCaseMixin
 
+# `GenTestCase` is loaded lazily by `__getattr__`, on `import *` as well
 __all__ = (
     'GenTestCase',
     'WorkflowTestCaseMixin',
@@ -23,53 +23,23 @@ else:
     from unittest import TestCase  # type: ignore[assignment]
 
 
-GENERATOR_VERSION = None
-
-try:
-    from apitests.generator import GenerativeTestCaseMixin as BaseGenerativeTestCaseMixin
-except ImportError:
-    if settings.GENERATOR_MODE:
-        class BaseGenerativeTestCaseMixin:  # type: ignore[no-redef]
-            def test_one(self):
-                msg = (
-                    '\nInstall generator:\n'
-                    '% pip install apitests'
-                )
-                raise ImportError(msg)
-    else:
-        class BaseGenerativeTestCaseMixin:  # type: ignore[no-redef]
-            pass
-else:
-    import apitests
-    GENERATOR_VERSION = apitests.VERSION
-    if settings.GENERATOR_MODE:
-        sys.stdout.write(
-            '\n\n[ATTENTION] Make sure that installed latest version of generator:\n'
-            ' % pip install apitests\n\n'
-        )
-
-
-class GenerativeTestCaseMixin(
-    BaseGenerativeTestCaseMixin,
-    WorkflowTestCaseMixin,
-):
-    render_template = os.path.join(os.path.dirname(__file__), 'jinja2/apitests/tests.py.tpl')
-    render_template_md = os.path.join(os.path.dirname(__file__), 'jinja2/apitests/tests.rag.md.tpl')
-    external_services = settings.EXTERNALS
+GENERATOR_CLASSES = (
+    'GENERATOR_VERSION',
+    'GenerativeTestCaseMixin',
+    'GenTestCase',
+)
 
-    render_context = {
-        'apitests': __name__.rsplit('.', 1)[0],
-        'IS_DJANGO_STACK': settings.IS_DJANGO_STACK,
-        'version': GENERATOR_VERSION,
-    }
 
-    @classmethod
-    def post_process(cls, workflows_tree):
-        pass
+def __getattr__(name):
+    # generator classes pull generator dependencies, load them on first use
+    if name in GENERATOR_CLASSES:
+        from . import generative
+        return getattr(generative, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
-class GenTestCase(GenerativeTestCaseMixin, TestCase):
-    pass
+def __dir__():
+    return sorted(list(globals()) + list(GENERATOR_CLASSES))
 
 
 class WorkflowTestCase(WorkflowTestCaseMixin, TestCase):
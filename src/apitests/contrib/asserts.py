@@ -26,6 +26,9 @@ class CustomAssertsCaseMixin:
                 self.assert_uncalled_points(workflow)
 
     def assert_uncalled_points(self, workflow):
+        if not workflow.has_uncalled_calls():
+            return
+
         points_uncalled = workflow.get_external_calls(called=False)
         points_uncalled = [point.raw for point in points_uncalled]
         self.assertFalse(  # type: ignore[attr-defined]
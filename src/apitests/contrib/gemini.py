@@ -1,7 +1,13 @@
-import requests
 import os
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
+
+import urllib3
+from urllib3.util import Retry
+
+from .. import settings  # noqa: TID252
+from .llmcache import get_payload_cache
 
 def extract_json_from_text(text):
     """
@@ -12,66 +18,179 @@ def extract_json_from_text(text):
         return match.group(1)
     return None
 
+MODEL = "gemini-1.5-flash"
+
+PROMPT_TEMPLATE = "Give example payload of response for http request: [{method}] {url}"
+
+BATCH_PROMPT_TEMPLATE = (
+    "Give example payloads of responses for http requests. "
+    "Answer with one JSON object mapping every request line to its payload:\n{requests}"
+)
+
+
+class GeminiClient:
+    """
+    Pooled Gemini client with retries.
+    It uses urllib3 directly, so it is not intercepted by patched `requests`.
+    Prompts of many endpoints are batched and batches are sent concurrently.
+    `base_url` can point to a local stand-in server.
+    """
+
+    def __init__(
+        self, api_key=None, base_url=None, model=None,
+        concurrency=None, batch_size=None, timeout=60, retries=3
+    ):
+        self.api_key = api_key or os.environ.get("GEMINI_API_KEY")
+        self.base_url = (base_url or settings.LLM_URL).rstrip('/')
+        self.model = model or settings.LLM_MODEL or MODEL
+        self.concurrency = concurrency or settings.LLM_CONCURRENCY
+        self.batch_size = batch_size or settings.LLM_BATCH_SIZE
+        self.pool = urllib3.PoolManager(
+            maxsize=self.concurrency,
+            timeout=urllib3.Timeout(total=timeout),
+            retries=Retry(
+                total=retries, backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504], allowed_methods=None
+            ),
+        )
+
+    def generate(self, text_prompt):
+        """
+        Generated text or None
+        """
+        url = f"{self.base_url}/models/{self.model}:generateContent"
+        if self.api_key:
+            url += f"?key={self.api_key}"
+        data = {
+            'contents': [{
+                'parts': [{
+                    'text': text_prompt
+                }]
+            }]
+        }
+        try:
+            response = self.pool.request(
+                'POST', url, body=json.dumps(data).encode(),
+                headers={'Content-Type': 'application/json'}
+            )
+        except urllib3.exceptions.HTTPError as e:
+            print(f"An error occurred: {e}")
+            return None
+        if response.status >= 400:
+            print(f"An error occurred: {response.status} {response.data[:200]}")
+            return None
+        try:
+            return json.loads(response.data)['candidates'][0]['content']['parts'][0]['text']
+        except (ValueError, KeyError, IndexError) as e:
+            print(f"\nCould not extract text from response: {e}")
+            return None
+
+    @staticmethod
+    def parse_json(text):
+        if text is None:
+            return None
+        try:
+            return json.loads(extract_json_from_text(text) or text)
+        except json.JSONDecodeError:
+            print("\nCould not parse the extracted JSON string.")
+            return None
+
+    def generate_payload(self, method, url):
+        return self.parse_json(self.generate(PROMPT_TEMPLATE.format(method=method.upper(), url=url)))
+
+    def generate_batch(self, endpoints):
+        if len(endpoints) == 1:
+            return {endpoints[0]: self.generate_payload(*endpoints[0])}
+
+        lines = {f"[{method.upper()}] {url}": (method, url) for method, url in endpoints}
+        payloads = self.parse_json(self.generate(BATCH_PROMPT_TEMPLATE.format(requests='\n'.join(lines))))
+        result = {}
+        if isinstance(payloads, dict):
+            for line, payload in payloads.items():
+                if line in lines:
+                    result[lines[line]] = payload
+        # the model skipped some of requests
+        for endpoint in endpoints:
+            if endpoint not in result:
+                result[endpoint] = self.generate_payload(*endpoint)
+        return result
+
+    def generate_payloads(self, endpoints):
+        """
+        [(method, url), ...] -> {(method, url): payload or None}
+        """
+        endpoints = list(dict.fromkeys(endpoints))
+        batches = [endpoints[i:i + self.batch_size] for i in range(0, len(endpoints), self.batch_size)]
+        result = {}
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            for payloads in executor.map(self.generate_batch, batches):
+                result.update(payloads)
+        return result
+
+
+# pooled clients by api key
+_clients = {}
+
+
+def get_client(api_key=None):
+    client = _clients.get(api_key)
+    if client is None:
+        client = _clients[api_key] = GeminiClient(api_key=api_key)
+    return client
+
+
 def generate_gemini_content(api_key, text_prompt):
     """
     Generates content using the Gemini API.
     """
-    url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
-    
-    headers = {
-        'Content-Type': 'application/json',
-    }
-    
-    params = {
-        'key': api_key,
-    }
-    
-    data = {
-        'contents': [{
-            'parts': [{
-                'text': text_prompt
-            }]
-        }]
-    }
-    
-    try:
-        response = requests.post(url, headers=headers, params=params, json=data)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"An error occurred: {e}")
+    text = get_client(api_key).generate(text_prompt)
+    if text is None:
         return None
+    return {'candidates': [{'content': {'parts': [{'text': text}]}}]}
 
 
 def get_payload(method, url):
-    parsed_json = None
     """
-    Main function to run the Gemini API example.
+    Payload from disk cache or generated by Gemini.
     """
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
+    return get_payloads([(method, url)])[(method, url)]
+
+
+def get_payloads(endpoints):
+    """
+    Payloads of many endpoints, cached ones are not requested.
+    """
+    cache = get_payload_cache()
+    client = get_client()
+    result = {}
+    missed = []
+    for method, url in endpoints:
+        payload = None
+        if cache is not None:
+            payload = cache.get(cache.make_key(method, url, PROMPT_TEMPLATE, client.model))
+        if payload is None:
+            missed.append((method, url))
+        result[(method, url)] = payload
+
+    if not missed:
+        return result
+    if not client.api_key and client.base_url == settings.LLM_DEFAULT_URL:
         print("Error: GEMINI_API_KEY environment variable not set.")
         print("Please set it to your Gemini API key.")
-        return
+        return result
 
-    prompt = f"Give example payload of response for http request: [{method.upper()}] {url}"
-    
-    generated_content = generate_gemini_content(api_key, prompt)
-    if generated_content:
-        # Extract and print just the generated text
-        try:
-            text = generated_content['candidates'][0]['content']['parts'][0]['text']
-            
-            json_str = extract_json_from_text(text)
-            if json_str:
-                try:
-                    parsed_json = json.loads(json_str)
-                except json.JSONDecodeError:
-                    print("\nCould not parse the extracted JSON string.")
-            else:
-                print("\nNo JSON block found in the generated text.")
-        except (KeyError, IndexError) as e:
-            print(f"\nCould not extract text from response: {e}")
+    for (method, url), payload in client.generate_payloads(missed).items():
+        result[(method, url)] = payload
+        if cache is not None and payload is not None:
+            cache.set(
+                cache.make_key(method, url, PROMPT_TEMPLATE, client.model), payload,
+                method=method.upper(), url=url, model=client.model
+            )
+    return result
 
-        return parsed_json
 
+def generate_payload(method, url):
+    """
+    Main function to run the Gemini API example.
+    """
+    return get_client().generate_payload(method, url)
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import re
+import time
+from urllib.parse import urlparse
+
+from .. import settings  # noqa: TID252
+
+__all__ = (
+    'PayloadCache',
+    'get_payload_cache',
+    'normalize_path',
+)
+
+# ids, hashes and other generated segments of urls
+PATH_PARAM_RE = re.compile(
+    r'^(\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{16,}|\d+(\.\d+){3})$',
+    re.IGNORECASE
+)
+
+
+def normalize_path(url):
+    """
+    'https://ipinfo.io/8.8.8.8/geo' -> 'ipinfo.io/{param}/geo'
+    """
+    obj = urlparse(url)
+    segments = [
+        '{param}' if PATH_PARAM_RE.match(segment) else segment
+        for segment in obj.path.split('/')
+    ]
+    return obj.netloc + '/'.join(segments)
+
+
+class PayloadCache:
+    """
+    Content-addressed disk cache of LLM generated payloads.
+    Key is hash of method, normalized path, prompt template and model,
+    entries are evicted by TTL and total size (least recently used first).
+    """
+
+    def __init__(self, path, ttl=None, max_size=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+
+    @staticmethod
+    def make_key(method, url, template, model):
+        data = json.dumps([method.upper(), normalize_path(url), template, model])
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.path, key[:2], f'{key}.json')
+
+    def get(self, key):
+        path = self.get_path(key)
+        try:
+            stat = os.stat(path)
+            if self.ttl is not None and time.time() - stat.st_mtime > self.ttl:
+                os.remove(path)
+                return None
+            with open(path) as cache_file:
+                payload = json.load(cache_file)['payload']
+            # hits are recently used for eviction
+            os.utime(path, (time.time(), stat.st_mtime))
+        except (OSError, ValueError, KeyError, TypeError):
+            # missed, expired or corrupted entry
+            return None
+        return payload
+
+    def set(self, key, payload, **meta):
+        path = self.get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as cache_file:
+            json.dump({'meta': meta, 'payload': payload}, cache_file)
+        os.replace(tmp_path, path)
+        if self.max_size is not None:
+            self.evict()
+
+    def entries(self):
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    try:
+                        yield path, os.stat(path)
+                    except OSError:
+                        pass
+
+    def evict(self):
+        now = time.time()
+        entries = []
+        for path, stat in self.entries():
+            if self.ttl is not None and now - stat.st_mtime > self.ttl:
+                os.remove(path)
+            else:
+                entries.append((stat.st_atime, stat.st_size, path))
+
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if self.max_size is None or size <= self.max_size:
+                break
+            os.remove(path)
+            size -= entry_size
+
+    def get_or_generate(self, method, url, generate, template, model):
+        """
+        `generate(method, url)` is called for missed keys only, None results are not cached
+        """
+        key = self.make_key(method, url, template, model)
+        payload = self.get(key)
+        if payload is None:
+            payload = generate(method, url)
+            if payload is not None:
+                self.set(key, payload, method=method.upper(), url=url, model=model)
+        return payload
+
+
+def get_payload_cache():
+    if not settings.LLM_CACHE:
+        return None
+    return PayloadCache(settings.LLM_CACHE, ttl=settings.LLM_CACHE_TTL, max_size=settings.LLM_CACHE_SIZE)
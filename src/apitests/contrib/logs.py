@@ -1,11 +1,19 @@
+from collections import deque
 from contextlib import contextmanager
-from logging import Logger
-from unittest.mock import patch
+from functools import cached_property
+from logging import (
+    Logger,
+    getLevelName,
+    getLogger,
+)
 
 from .. import points  # noqa: TID252
 
 __all__ = (
+    'LogCapture',
+    'LogMatcher',
     'LogsTestCaseMixin',
+    'RecordPointLog',
 )
 
 
@@ -15,12 +23,143 @@ def clean_msg(value):
     return value
 
 
+class RecordPointLog(points.PointLog):
+    """
+    Log point over captured record, message is formatted on first access
+    """
+
+    def __init__(self, record):
+        self.called = False
+        self.alias = None
+        self.record = record
+        self.method = record.levelname + ':' + record.name
+
+    @cached_property
+    def path(self):
+        return clean_msg(self.record.getMessage())
+
+    @cached_property
+    def pattern(self):
+        return clean_msg(str(self.record.msg))
+
+
+class LogMatcher:
+    """
+    Expected log points of a workflow indexed by (level name, logger name).
+    Records are matched on arrival by message template (`pattern`)
+    or by formatted message (`path`), in order per logger and level.
+    Points of loggers disabled for their level are not expected.
+    """
+
+    def __init__(self, expected):
+        self.index = {}
+        self.unmatched = 0
+        for point in expected:
+            levelname, _, name = point.method.partition(':')
+            if not self.is_enabled(levelname, name):
+                continue
+            self.index.setdefault((levelname, name), []).append(point)
+            point.called = False
+            self.unmatched += 1
+
+    @classmethod
+    def from_workflow(cls, workflow):
+        return cls([point for point in workflow.points if point.role == points.Role.LOG])
+
+    @staticmethod
+    def is_enabled(levelname, name):
+        logger = getLogger(name)
+        if logger.disabled:
+            return False
+        level = getLevelName(levelname)
+        return not isinstance(level, int) or logger.isEnabledFor(level)
+
+    def __bool__(self):
+        return bool(self.index)
+
+    def feed(self, record):
+        queue = self.index.get((record.levelname, record.name))
+        if not queue:
+            return False
+
+        template = message = None
+        for position, point in enumerate(queue):
+            if point.pattern:
+                if template is None:
+                    template = clean_msg(str(record.msg))
+                matched = point.pattern == template
+            else:
+                if message is None:
+                    message = clean_msg(record.getMessage())
+                matched = point.path == message
+                if not matched and record.args:
+                    # template passed as message, e.g. long or generalized messages
+                    if template is None:
+                        template = clean_msg(str(record.msg))
+                    matched = point.path == template
+            if matched:
+                point.called = True
+                del queue[position]
+                self.unmatched -= 1
+                return True
+        return False
+
+    def get_unmatched(self):
+        return [point for queue in self.index.values() for point in queue]
+
+
+class LogCapture:
+    """
+    Captures records of all loggers instead of their handlers.
+    Logger levels are honored, records are filtered by level and logger name
+    before any formatting and only the last `limit` points are kept.
+    """
+
+    def __init__(self, accept=None, level=0, limit=1000, matcher=None):
+        self.accept = accept
+        self.level = level
+        self.points = deque(maxlen=limit)
+        self.accepted = {}
+        self.matcher = matcher
+
+    def is_accepted(self, name):
+        accepted = self.accepted.get(name)
+        if accepted is None:
+            accepted = self.accepted[name] = self.accept is None or self.accept(name)
+        return accepted
+
+    def handle(self, record):
+        if self.matcher and self.matcher.unmatched:
+            self.matcher.feed(record)
+        if record.levelno >= self.level and self.is_accepted(record.name):
+            self.points.append(RecordPointLog(record))
+
+    @contextmanager
+    def patch(self):
+        handle = Logger.handle
+        capture = self
+
+        def capture_handle(logger, record):
+            # the same checks as `Logger.handle` before handlers are called
+            if not logger.disabled and logger.filter(record):
+                capture.handle(record)
+
+        Logger.handle = capture_handle  # type: ignore[method-assign]
+        try:
+            yield self
+        finally:
+            Logger.handle = handle  # type: ignore[method-assign]
+
+
 class LogsTestCaseMixin:
     log_asserts_filter: list = []
+    # minimal level of captured records over configured loggers levels
+    log_capture_level = 0
+    log_capture_limit = 1000
 
     @contextmanager
     def context_common(self, workflow):
-        with self.capture_logs():
+        with self.capture_logs(workflow):
             with super().context_common(workflow):  # type: ignore[misc]
                 yield
 
@@ -29,41 +168,29 @@ class LogsTestCaseMixin:
             for prefix in self.log_asserts_filter:
                 if name.startswith(prefix):
                     return True
+            return False
 
         return True
 
     @contextmanager
-    def capture_logs(self):
-        logs_points = []
-
-        test_case = self
-
-        class ExtendedLogger(Logger):
-            @classmethod
-            def capture(cls, record):
-                if not test_case.use_capture(record.name):
-                    return
-
-                point = points.PointLog(
-                    record.levelname + ':' + record.name, clean_msg(record.getMessage()),
-                    pattern=clean_msg(record.msg)
-                )
-                logs_points.append(point)
-                if test_case.generator_mode:  # type: ignore[attr-defined]
-                    # DISABLED: found a bug 
-                    # test_case.extend_pipeline([point.raw])  # type: ignore[attr-defined]
-                    return
-
-            def isEnabledFor(self, level):
-                return True
-
-            def handle(self, record):
-                self.capture(record)
-
-        setattr(Logger, 'capture', ExtendedLogger.capture)
-        setattr(Logger, 'handle', ExtendedLogger.handle)
-        setattr(Logger, 'isEnabledFor', ExtendedLogger.isEnabledFor)
-
-        yield
-
-        # TODO: check logs against workflow
+    def capture_logs(self, workflow=None):
+        matcher = None
+        if isinstance(workflow, points.Workflow) and not self.generator_mode:  # type: ignore[attr-defined]
+            matcher = LogMatcher.from_workflow(workflow)
+
+        capture = LogCapture(
+            accept=self.use_capture,
+            level=self.log_capture_level,
+            limit=self.log_capture_limit,
+            matcher=matcher
+        )
+        self.logs_points = capture.points
+
+        with capture.patch():
+            yield capture
+
+        if matcher:
+            self.assertFalse(  # type: ignore[attr-defined]
+                matcher.unmatched,
+                'Expected logs are not found: %s' % [point.raw for point in matcher.get_unmatched()]
+            )
@@ -12,6 +12,14 @@ from apitests import (
     points,
     settings,
 )
+from apitests.generator.fingerprints import (
+    combination_key_from_json,
+    dump_fingerprints,
+    get_fingerprint,
+    load_fingerprints,
+    stubs_fingerprints,
+)
+from apitests.generator.parallel import generate_parallel
 from apitests.generator.stubgen import StubsGenMixin
 from apitests.generator.transformer import (
     fold_pipeline,
@@ -22,9 +30,11 @@ from apitests.generator.transformer import (
     set_test_any,
 )
 from apitests.helpers import (
-    render_string,
+    render_file,
+    stream_file,
     yaml_dumps,
 )
+from apitests.replay import compile_workflows, dump_replay
 from apitests.serialization.arazzo import build_workflows
 from apitests.serialization.visual import render_table
 
@@ -36,14 +46,12 @@ __all__ = (
 )
 
 
-def render_tests(context, render_template):
-    with open(render_template) as points_file:
-        data = points_file.read()
-
-    output = render_string(data, context)
+def render_tests(context, render_template, output=None):
+    if output:
+        stream_file(render_template, output, context)
+        return None
 
-    output = output.replace("'ANY'", 'ANY')
-    return output
+    return render_file(render_template, context)
 
 
 def generative_test_standalone(max_tests=None, snapshots=None, regenerate=True, run=True, feature=None):
@@ -162,6 +170,7 @@ def expand_tests(
                 })
             meta['success'] = not any([item.get('status') in [408, 500, 503] for item in pipeline])
             meta['prefix'] = 'ok_' if meta['success'] else 'error_'
+            meta['test_name'] = f"test_{len(pipelines)}_{meta['prefix']}{name}"
             if meta['success']:
                 meta['success_no'] = success_no
                 success_no += 1
@@ -204,6 +213,9 @@ class GenMeta(type):
         # TODO: revise run from .apiflows.yaml
         run = attrs.get('run')
         max_tests = attrs.get('max_tests')
+        workers = attrs.get('generator_workers') or max(
+            [getattr(base, 'generator_workers', 1) for base in bases] + [1]
+        )
 
         generator_mode = (
             '--tag=generator' in sys.argv or
@@ -218,7 +230,12 @@ class GenMeta(type):
             base_path = os.path.dirname(import_module(attrs['__module__']).__file__)
             snapshots = os.path.join(base_path, f'test_autogen_{feature}.apiflows.yaml')
             pipelines = []
-            if regenerate:
+            start = 0
+            if regenerate and workers > 1:
+                # combinations are generated by workers in `setUpClass`
+                attrs['test_000_generated'] = lambda self: self.check_generator_workers()
+                start = 1
+            elif regenerate:
                 if max_tests is None:
                     max_tests = settings.AUTOGEN_MAX_TESTS
                 max_tests *= 2
@@ -227,7 +244,7 @@ class GenMeta(type):
             if run:
                 pipelines += expand_tests(snapshots)
 
-            for i, (name, pipeline, prompt, context,) in enumerate(pipelines):
+            for i, (name, pipeline, prompt, context,) in enumerate(pipelines, start=start):
                 index = str(1000 + i)[1:]
                 attrs[f'test_{index}_{name}'] = lambda self: self.make(name, pipeline, prompt, context)
 
@@ -239,11 +256,21 @@ class GenerativeTestCaseMixin(ContextMixin, metaclass=GenMeta):
     initials = []
     asserts = []
     pipelines = {}
+    pipelines_combinations = {}
     finished = False
 
     skip_fold = False
 
     skip_gen_doublerun = False
+    # repeat run right after the first one, without `doublerun_delay`:
+    # second-resolution timestamps repeat and are not generalized
+    interleave_gen_doublerun = False
+
+    generator_workers = 1
+    generator_errors = []
+
+    # reuse pipelines of unchanged stubs from the previous generation
+    regenerate_incremental = False
 
     standalone = False
     clean_method = None
@@ -264,9 +291,105 @@ class GenerativeTestCaseMixin(ContextMixin, metaclass=GenMeta):
             initial_points=list(cls.initials),
             contexts=list(cls.contexts),
             skip_gen_doublerun=cls.skip_gen_doublerun,
+            interleave_gen_doublerun=cls.interleave_gen_doublerun,
             external_services=cls.external_services,
         )
 
+        if cls.regenerate_incremental:
+            cls.reuse_pipelines()
+
+        cls.stubs_instance.prefetch_payloads(cls.get_unknown_endpoints())
+
+        if cls.generator_workers > 1:
+            cls.generator_errors = generate_parallel(cls, cls.generator_workers)
+            cls.stubs_instance.stop_combinations()
+
+    @classmethod
+    def generator_fingerprint(cls):
+        """
+        Fingerprint of generator inputs besides stubs: initials, contexts
+        and source code of the test case classes.
+        Override to include application code the workflows depend on.
+        """
+        sources = []
+        for klass in cls.mro():
+            try:
+                path = inspect.getsourcefile(klass)
+            except TypeError:
+                continue
+            if path and path not in sources:
+                sources.append(path)
+
+        code = []
+        for path in sources:
+            with open(path, 'rb') as source_file:
+                code.append(get_fingerprint(source_file.read().decode('utf-8', 'replace')))
+
+        initials = [
+            [point.raw for point in (initial if isinstance(initial, list) else [initial])]
+            for initial in cls.initials
+        ]
+        return get_fingerprint({
+            'version': VERSION,
+            'initials': initials,
+            'contexts': list(cls.contexts),
+            'skip_gen_doublerun': cls.skip_gen_doublerun,
+            'code': code,
+        })
+
+    @classmethod
+    def get_unknown_endpoints(cls):
+        """
+        [(method, url), ...] of external calls in previous snapshots
+        which are missed in stubs, their payloads are generated by LLM.
+        """
+        stubs = cls.stubs_instance
+        hosts = {}
+        for host, service in stubs.external_services.items():
+            hosts.setdefault(service, host)
+
+        tree = points.Workflow.load_from_file(cls.get_pipeline_spanshots())
+        endpoints = []
+        for flow in get_flows(tree):
+            for item in load_flow(tree, flow):
+                if item['_point'] != 'external_api' or item.get('_service') not in hosts:
+                    continue
+                _, options = stubs.get_pattern_data(stubs.data, item['_service'], item['path'], method=item['method'])
+                endpoint = (item['method'].upper(), 'https://' + hosts[item['_service']] + item['path'])
+                if not options and endpoint not in endpoints:
+                    endpoints.append(endpoint)
+        return endpoints
+
+    @classmethod
+    def reuse_pipelines(cls):
+        cache = load_fingerprints(cls.get_pipeline_fingerprints())
+        if not cache or cache['fingerprint'] != cls.generator_fingerprint():
+            return
+
+        stubs = cls.stubs_instance
+        current = stubs_fingerprints(stubs.data)
+        previous = cache['stubs']
+
+        records = []
+        routes = []
+        for record in cache['pipelines']:
+            key = combination_key_from_json(record['combination'])
+            record_routes = [route for route, _ in key[2:]]
+            if all(
+                current.get(service, {}).get(mp) is not None and
+                current[service][mp] == previous.get(service, {}).get(mp)
+                for service, mp in record_routes
+            ):
+                records.append((key, record))
+                routes += [route for route in record_routes if route not in routes]
+
+        stubs.use_routes(routes)
+        for key, record in records:
+            stubs.add_passed_combination(stubs.combination_from_key(key))
+            cls.add_pipeline(0, record['pipeline'], combination=key)
+            if record['repeated'] is not None:
+                cls.add_pipeline(1, record['repeated'])
+
     @classmethod
     def generator_tear_down_class(cls):
         cls.save_tests()
@@ -306,6 +429,13 @@ class GenerativeTestCaseMixin(ContextMixin, metaclass=GenMeta):
     def stop_generator(cls):
         cls.finished = True
 
+    def check_generator_workers(self):
+        self.stop_generator()
+        self.assertFalse(  # type: ignore[attr-defined]
+            self.generator_errors,
+            'Generator workers failed:\n%s' % '\n'.join(self.generator_errors)
+        )
+
     @classmethod
     def get_base_path(cls):
         return os.path.dirname(os.path.abspath(sys.modules[cls.__module__].__file__))
@@ -317,6 +447,10 @@ class GenerativeTestCaseMixin(ContextMixin, metaclass=GenMeta):
         snapshots = os.path.join(base_path, f'test_autogen_{cls.feature}{version}.apiflows.yaml')
         return snapshots
 
+    @classmethod
+    def get_pipeline_fingerprints(cls):
+        return '%s.fingerprints.json' % cls.get_pipeline_spanshots().replace('.apiflows.yaml', '')
+
     @classmethod
     def get_pipeline_html(cls):
         return '%s.arazzo.html' % cls.get_pipeline_spanshots().replace('.apiflows.yaml', '')
@@ -335,6 +469,10 @@ class GenerativeTestCaseMixin(ContextMixin, metaclass=GenMeta):
         # TODO: rewrite
         return '%s.rag.md' % cls.get_pipeline_spanshots().replace('.apiflows.yaml', '')
 
+    @classmethod
+    def get_pipeline_replay(cls):
+        return '%s.replay.json' % cls.get_pipeline_spanshots().replace('.apiflows.yaml', '')
+
     def append_point(self, point):
         data = point.raw
         data.update({'_context': self.context})
@@ -361,12 +499,22 @@ class GenerativeTestCaseMixin(ContextMixin, metaclass=GenMeta):
         self.pipeline.extend(pipeline)
 
     def append_pipeline(self, pipeline):
-        test_name = self._testMethodName
-        test_case = strclass(self.__class__)
+        self.add_pipeline(
+            self.stubs_instance.iteration, pipeline,
+            combination=self.stubs_instance.passed_key
+        )
+
+    @classmethod
+    def get_pipelines_key(cls, iteration):
+        return '%s_%s' % (strclass(cls), iteration,)
+
+    @classmethod
+    def add_pipeline(cls, iteration, pipeline, combination=None):
         test_case = 'TEST'
-        key = '%s_%s' % (strclass(self.__class__), self.stubs_instance.iteration,)
-        self.pipelines.setdefault(key, [])
-        num = str(100 + len(self.pipelines[key]))[1:]
+        key = cls.get_pipelines_key(iteration)
+        cls.pipelines.setdefault(key, [])
+        cls.pipelines_combinations.setdefault(key, []).append(combination)
+        num = str(100 + len(cls.pipelines[key]))[1:]
         # 'test_%s_generated' % num
         # print(test_name, 'test_%s_generated' % num)
         # TODO: fix part of name `002``
@@ -374,15 +522,15 @@ class GenerativeTestCaseMixin(ContextMixin, metaclass=GenMeta):
         name = [
             test_case, '002', 'test_%s_generated' % num,
         ]
-        prompt = [point['prompt'] for point in self.pipeline if 'prompt' in point]
+        prompt = [point['prompt'] for point in pipeline if 'prompt' in point]
         if prompt:
             name = [
                 test_case, 'test_%s_generated' % num,
             ]
-        self.pipelines[key].append(('.'.join(name), pipeline,))
+        cls.pipelines[key].append(('.'.join(name), pipeline,))
 
     def get_pipelines(self):
-        key = '%s_%s' % (strclass(self.__class__), self.stubs_instance.iteration,)
+        key = self.get_pipelines_key(self.stubs_instance.iteration)
         return self.pipelines[key]
 
     @property
@@ -395,11 +543,25 @@ class GenerativeTestCaseMixin(ContextMixin, metaclass=GenMeta):
 
     @classmethod
     def save_tests(cls):
-        key = '%s_%s' % (strclass(cls), 0,)
-        key_repeated = '%s_%s' % (strclass(cls), 1,)
+        key = cls.get_pipelines_key(0)
+        key_repeated = cls.get_pipelines_key(1)
         data = cls.pipelines.pop(key, {})
-        data = dict(data)
         data_repeated = cls.pipelines.pop(key_repeated, {})
+        combinations = cls.pipelines_combinations.pop(key, [])
+        cls.pipelines_combinations.pop(key_repeated, None)
+
+        if data and cls.regenerate_incremental:
+            records = [
+                (combinations[index], pipeline, data_repeated[index][1] if index < len(data_repeated) else None)
+                for index, (_, pipeline) in enumerate(data)
+                if combinations[index] is not None
+            ]
+            dump_fingerprints(
+                cls.get_pipeline_fingerprints(), cls.generator_fingerprint(),
+                stubs_fingerprints(cls.stubs_instance.data), records
+            )
+
+        data = dict(data)
         data_repeated = dict(data_repeated)
         if not data:
             return
@@ -464,11 +626,11 @@ class GenerativeTestCaseMixin(ContextMixin, metaclass=GenMeta):
             'feature': cls.feature,
         })
 
-        with open(cls.get_pipeline_py(), 'w') as tests_file:
-            tests_file.write(render_tests(cls.render_context, cls.render_template))
+        render_tests(cls.render_context, cls.render_template, output=cls.get_pipeline_py())
+        render_tests(cls.render_context, cls.render_template_md, output=cls.get_pipeline_rag())
 
-        with open(cls.get_pipeline_rag(), 'w') as tests_file:
-            tests_file.write(render_tests(cls.render_context, cls.render_template_md))
+        tests, bodies = compile_workflows(pipelines, cls.stubs_instance.data)
+        dump_replay(cls.get_pipeline_replay(), tests, bodies, cls.get_pipeline_py(), cls.stubs)
 
         yaml_dumps(cls.stubs_instance.data_used)
         # TODO: improve approuche 
@@ -0,0 +1,75 @@
+"""
+Fingerprints of generator inputs for incremental regeneration.
+
+Cache stored next to snapshots keeps fingerprints of every used stub
+route (`service`, `method#pattern`) and passed pipelines with their
+stub combinations. Pipelines touching only unchanged routes are reused,
+other combinations are executed again.
+"""
+
+import hashlib
+import json
+import os
+
+from apitests.generator.generalizer import clean_not_serializable
+
+__all__ = (
+    'get_fingerprint',
+    'stubs_fingerprints',
+    'load_fingerprints',
+    'dump_fingerprints',
+    'combination_key_from_json',
+    'combination_key_to_json',
+)
+
+
+def get_fingerprint(value):
+    data = json.dumps(clean_not_serializable(value), sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def stubs_fingerprints(data):
+    # options order matters: combinations refer options by index
+    return {
+        service: {
+            mp: get_fingerprint(list((options or {}).items()))
+            for mp, options in methods_paths.items()
+        }
+        for service, methods_paths in data.items()
+    }
+
+
+def combination_key_to_json(key):
+    return [key[0], key[1], [[service, mp, value] for (service, mp), value in key[2:]]]
+
+
+def combination_key_from_json(value):
+    context, initial, stubs = value
+    return (context, initial) + tuple(((service, mp), option) for service, mp, option in stubs)
+
+
+def load_fingerprints(path):
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as cache_file:
+        try:
+            return json.load(cache_file)
+        except json.JSONDecodeError:
+            return None
+
+
+def dump_fingerprints(path, fingerprint, stubs, records):
+    with open(path, 'w') as cache_file:
+        json.dump({
+            'fingerprint': fingerprint,
+            'stubs': stubs,
+            'pipelines': [
+                {
+                    'combination': combination_key_to_json(key),
+                    'pipeline': clean_not_serializable(pipeline),
+                    'repeated': clean_not_serializable(repeated),
+                }
+                for key, pipeline, repeated in records
+            ],
+        }, cache_file)
@@ -0,0 +1,108 @@
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from importlib import import_module
+
+from apitests import settings
+from apitests.generator.generalizer import clean_not_serializable
+
+__all__ = (
+    'generate_parallel',
+    'generate_shard',
+)
+
+
+def load_test_case(module, qualname):
+    return reduce(getattr, qualname.split('.'), import_module(module))
+
+
+def get_max_tests(test_case):
+    max_tests = getattr(test_case, 'max_tests', None)
+    if max_tests is None:
+        max_tests = settings.AUTOGEN_MAX_TESTS
+    return max_tests
+
+
+def generate_shard(module, qualname, shard, shards):
+    """
+    Run generator for a part of stub combinations in a worker process.
+    Runs are limited by `max_tests` as in serial generation.
+    Returns passed pipelines by iteration, errors and used stubs.
+    """
+    test_case = load_test_case(module, qualname)
+    test_case.generator_workers = 1
+    test_case.finished = False
+    test_case.generator_set_up_class()
+
+    stubs = test_case.stubs_instance
+    stubs.shard = (shard, shards)
+
+    test = test_case('runTest')
+    pipelines = {0: [], 1: []}
+    errors = []
+    max_tests = get_max_tests(test_case)
+    # each run takes a test slot, double runs included
+    for _ in range(max_tests * 2):
+        if len(pipelines[0]) >= max_tests:
+            # the rest of slots are left for repeats
+            stubs.stop_combinations()
+
+        test.setUp()
+        try:
+            test.generate_test()
+        except Exception:
+            errors.append(traceback.format_exc())
+            continue
+
+        if test_case.finished:
+            break
+
+        pipelines[stubs.iteration].append((stubs.passed_key, clean_not_serializable(test.pipeline)))
+
+    data_used = {service: dict(options) for service, options in stubs.data_used.items()}
+    return pipelines, errors, data_used
+
+
+def generate_parallel(test_case, workers):
+    """
+    Shard stub combinations across worker processes and merge passed
+    pipelines into `test_case.pipelines`, skipping combinations already
+    passed by another worker. At most `max_tests` pipelines are added,
+    first runs are paired with repeats by combination key.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                generate_shard, test_case.__module__, test_case.__qualname__, shard, workers
+            )
+            for shard in range(workers)
+        ]
+        results = [future.result() for future in futures]
+
+    stubs = test_case.stubs_instance
+    passed = set(test_case.pipelines_combinations.get(test_case.get_pipelines_key(0), []))
+    max_tests = get_max_tests(test_case)
+    added = 0
+    errors = []
+    for pipelines, shard_errors, data_used in results:
+        errors.extend(shard_errors)
+
+        for service, methods_paths in data_used.items():
+            for mp, options in methods_paths.items():
+                if mp not in stubs.data_used.get(service, {}):
+                    stubs.data_used.add_options(service, mp, options)
+
+        repeated = dict(pipelines[1])
+        for key, pipeline in pipelines[0]:
+            if key in passed or added >= max_tests:
+                continue
+            if not test_case.skip_gen_doublerun and key not in repeated:
+                # repeat run failed or didn't fit into the slots
+                continue
+            added += 1
+            passed.add(key)
+            test_case.add_pipeline(0, pipeline, combination=key)
+            if key in repeated:
+                test_case.add_pipeline(1, repeated[key])
+
+    return errors
@@ -1,4 +1,3 @@
-import itertools
 import json
 import time
 import hashlib
@@ -8,16 +7,23 @@ from urllib.parse import (
     urlparse,
 )
 
-from apitests.contrib.gemini import get_payload
+from apitests.contrib.gemini import (
+    get_payload,
+    get_payloads,
+)
+from apitests.contrib.llmcache import normalize_path
 from apitests.stub import (
     MockResponse,
     MockResponseAsync,
     Stubs,
+    StubsData,
+    parse_option_key,
 )
 
 __all__ = (
     'CONTEXT_COMBINATION_INDEX',
     'INITIAL_COMBINATION_INDEX',
+    'CombinationsTree',
     'StubsGen',
     'StubsGenMixin',
 )
@@ -27,49 +33,132 @@ CONTEXT_COMBINATION_INDEX = 0
 INITIAL_COMBINATION_INDEX = 1
 
 
+class CombinationNode:
+    __slots__ = ('children', 'complete')
+
+    def __init__(self):
+        self.children = {}
+        self.complete = False
+
+
+class CombinationsTree:
+    """
+    Prefix tree of passed combinations, `None` values match any option.
+
+    Walks combinations in `itertools.product` order and skips
+    whole subtrees already covered by a passed combination.
+    """
+
+    def __init__(self):
+        self.root = CombinationNode()
+
+    def add(self, combination):
+        combination = list(combination)
+        while combination and combination[-1] is None:
+            combination.pop()
+
+        node = self.root
+        for value in combination:
+            node = node.children.setdefault(value, CombinationNode())
+        node.complete = True
+
+    def next_combination(self, sizes, after=None):
+        """First not covered combination after `after` (or the first one)."""
+        last = len(sizes) - 1
+
+        def walk(depth, nodes, tight):
+            if any(node.complete for node in nodes):
+                return None
+            if depth > last:
+                return ()
+
+            start = 0
+            if tight:
+                start = after[depth] + (1 if depth == last else 0)
+
+            for value in range(start, sizes[depth]):
+                children = []
+                for node in nodes:
+                    for key in (value, None):
+                        child = node.children.get(key)
+                        if child is not None:
+                            children.append(child)
+
+                rest = walk(depth + 1, children, tight and value == after[depth])
+                if rest is not None:
+                    return (value,) + rest
+
+            return None
+
+        return walk(0, [self.root], after is not None)
+
+
 class StubsGenMixin:
     iterations = 2
-    iteration_combinations = []
+    # pause before the sequential repeat pass, lets time based values differ
+    doublerun_delay = 1
 
     def __init__(
         self, data, initial_points=None, contexts=None,
         assert_requests=False, prefill_data_used=False,
-        skip_gen_doublerun=False, external_services={}
+        skip_gen_doublerun=False, interleave_gen_doublerun=False,
+        external_services={}
     ):
         super().__init__(data, assert_requests=assert_requests, external_services=external_services)
         self.skip_gen_doublerun = skip_gen_doublerun
+        self.interleave_gen_doublerun = interleave_gen_doublerun
+        self.iteration_combinations = []
         self.passed_combinations = []
-        self.data_used = {}
+        self.passed_tree = CombinationsTree()
+        self.data_used = StubsData()
         self.generated_pipeline = []
         self.stub_combination = None
+        self.passed_key = None
         self.paths_indexes = {}
+        # LLM payloads of endpoints missed in stubs, see `prefetch_payloads`
+        self.prefetched_payloads = {}
 
         self.iteration = 0
 
+        # (shard, shards): part of combinations handled by a generator worker
+        self.shard = None
+
         self.initial_points = initial_points
         self.contexts = contexts
 
         if prefill_data_used:
-            self.data_used = data
+            # data may be shared through `stubs_registry`
+            self.data_used = self.data.copy()
 
         self.reload_combination()
 
     def reload_combination(self):
         self.get_paths_indexes()
         self.sizes = self.get_sizes()
-        self.combination_iter = itertools.product(*[list(range(n))for n in self.sizes])
+        self.combination_cursor = None
+        self.combinations_done = False
         self.stubs_size = len(self.sizes)
 
     def init_test(self):
         self.generated_pipeline = []
+        self.passed_key = None
 
-        if self.iteration == 0:
+        if self.interleave_gen_doublerun:
+            # repeat run goes right after the first run of the combination,
+            # there is no `doublerun_delay` pause, see `interleave_gen_doublerun`
+            if self.iteration_combinations:
+                self.iteration = 1
+                combination = self.iteration_combinations.pop(0)
+            else:
+                self.iteration = 0
+                combination = self.get_stub_combination()
+        elif self.iteration == 0:
             combination = self.get_stub_combination()
 
             if combination:
                 pass
             elif self.iteration_combinations:
-                time.sleep(1)
+                time.sleep(self.doublerun_delay)
                 self.iteration = 1
                 combination = self.iteration_combinations.pop(0)
             else:
@@ -152,11 +241,32 @@ class StubsGenMixin:
             value = self.stub_combination[self.paths_indexes[key]]
             combination[index] = value
 
-        self.passed_combinations.append(combination)
+        self.add_passed_combination(combination)
+        self.passed_key = self.combination_key(combination)
 
         if self.iteration == 0 and not self.skip_gen_doublerun:
             self.iteration_combinations.append(self.stub_combination)
 
+    def add_passed_combination(self, combination):
+        self.passed_combinations.append(combination)
+        self.passed_tree.add(combination)
+
+    def prefetch_payloads(self, endpoints):
+        """
+        Generate payloads of [(method, url), ...] by batched LLM prompts
+        before generation, instead of one prompt per unknown endpoint.
+        """
+        for (method, url), payload in get_payloads(endpoints).items():
+            if payload is not None:
+                self.prefetched_payloads[(method.upper(), normalize_path(url))] = payload
+
+    def use_routes(self, routes):
+        # register known routes upfront, e.g. from previous generation
+        for service, mp in routes:
+            if mp not in self.data_used.get(service, {}):
+                self.data_used.add_options(service, mp, self.data[service][mp])
+        self.reload_combination()
+
     @property
     def initial_point(self):
         return self.stub_combination[1]
@@ -181,33 +291,64 @@ class StubsGenMixin:
                     self.paths_indexes[key] = index
 
     def get_stub_combination(self):
-        while True:
-            try:
-                combo = next(self.combination_iter)
-            except StopIteration:
-                combo = None
+        while not self.combinations_done:
+            combo = self.passed_tree.next_combination(self.sizes, after=self.combination_cursor)
+            if combo is None:
+                self.combinations_done = True
                 break
 
-            any_matched = False
-            for passed in reversed(self.passed_combinations):
-                matched = True
-                for i, v in enumerate(passed):
-                    if v is not None and combo[i] != v:
-                        matched = False
-                        break
-                if matched:
-                    any_matched = True
-                    break
-
-            if not any_matched:
-                break
-        return combo
+            self.combination_cursor = combo
+            if self.is_shard_combination(combo):
+                return combo
+
+        return None
+
+    def stop_combinations(self):
+        self.combinations_done = True
+
+    def is_shard_combination(self, combo):
+        # workers split combinations by context, initial and the first stub,
+        # combinations before the first stub is discovered run in every worker
+        if self.shard is None or len(combo) <= INITIAL_COMBINATION_INDEX + 1:
+            return True
+
+        shard, shards = self.shard
+        return (
+            (combo[CONTEXT_COMBINATION_INDEX] * 31 + combo[INITIAL_COMBINATION_INDEX]) * 31 +
+            combo[INITIAL_COMBINATION_INDEX + 1]
+        ) % shards == shard
+
+    def combination_from_key(self, key):
+        combination = [None for i in range(self.stubs_size)]
+        combination[CONTEXT_COMBINATION_INDEX] = key[0]
+        combination[INITIAL_COMBINATION_INDEX] = key[1]
+        for route, value in key[2:]:
+            combination[self.paths_indexes[route]] = value
+        return combination
+
+    def combination_key(self, combination):
+        # worker independent key of passed combination
+        routes = {index: key for key, index in self.paths_indexes.items()}
+        stubs = [
+            (routes[index], value)
+            for index, value in enumerate(combination)
+            if index in routes and value is not None
+        ]
+        return (
+            combination[CONTEXT_COMBINATION_INDEX],
+            combination[INITIAL_COMBINATION_INDEX],
+        ) + tuple(sorted(stubs))
 
     @property
     def context(self):
         return self.contexts[self.stub_combination[0]]
 
     def request(self, method, url, async_mode=False, **kwargs):
+        # combinations and the pipeline are extended in order of requests
+        with self.lock:
+            return self.generate_response(method, url, async_mode=async_mode, **kwargs)
+
+    def generate_response(self, method, url, async_mode=False, **kwargs):
         response_class = MockResponseAsync if async_mode else MockResponse
         url = str(url)
         obj = urlparse(url)
@@ -231,15 +372,15 @@ class StubsGenMixin:
             pattern, options = self.get_pattern_data(self.data, service, path, method=method)
             if options:
                 method_pattern = '#'.join([method, pattern])
-                self.data_used.setdefault(service, {})
-                self.data_used[service][method_pattern] = options
+                self.data_used.add_options(service, method_pattern, options)
                 self.stub_combination += (0, )
                 self.reload_combination()
 
         if not options:
-            self.requests_patcher.stop()
-            payload = get_payload(method.upper(), url, )
-            self.requests_patcher.start()
+            payload = self.prefetched_payloads.get((method.upper(), normalize_path(url)))
+            if payload is None:
+                # LLM client is not routed through patched requests
+                payload = get_payload(method.upper(), url, )
             if payload is None:
                 raise NotImplementedError(
                     'Extend apistubs.yaml file.\n'
@@ -255,8 +396,7 @@ class StubsGenMixin:
                     '404-not_found_' + key: {},
                     '500-error_' + key: {},
                 }
-                self.data_used.setdefault(service, {})
-                self.data_used[service][method_pattern] = options
+                self.data_used.add_options(service, method_pattern, options)
                 self.stub_combination += (0, )
                 self.reload_combination()
         
@@ -266,11 +406,13 @@ class StubsGenMixin:
         index = self.get_response_index(service, method_pattern)
         cases = list(options.keys())
         content_key = cases[index]
-        status = int(content_key.split('-')[0])
-        prompt = content_key.split('-')[1]
+        status, prompt = parse_option_key(content_key)
         content = options[content_key]
 
-        respose = response_class(status, json.dumps(content))
+        body = self.data_used.get_body(service, method, method_pattern.split('#', 1)[1], content_key)
+        if body is None:
+            body = json.dumps(content)
+        respose = response_class(status, body)
 
         if 'params' in kwargs and kwargs['params']:
             params.update(kwargs['params'])
@@ -9,6 +9,10 @@ from apitests.generator.generalizer import (
     generalize_snapshot_by_double_run,
     set_pattern,
 )
+from apitests.utils import (
+    get_flows,
+    load_flow,
+)
 
 __all__ = (
     'fold_pipeline',
@@ -138,25 +142,17 @@ def normalize_configurations(data):
         item['entries'] = new_entries
 
 
-class HashedPoint(str):
-    def __new__(cls, point):
-        value = point.copy()
-        value.pop('_meta', None)
-        key = json.dumps(value)
-        obj = str.__new__(cls, key)
-        obj.payload = point
-        return obj
-
+class PointTable:
+    """
+    Interned points: one integer id per unique point (compared without `_meta`)
+    """
 
-def hashable_pipeline(data):
-    hashable_set = []
+    def __init__(self):
+        self.ids = {}
 
-    for item in data.values():
-        entries = []
-        for point in item:
-            entries.append(HashedPoint(point))
-        hashable_set.append(entries)
-    return hashable_set
+    def intern(self, point):
+        key = json.dumps({k: v for k, v in point.items() if k != '_meta'})
+        return self.ids.setdefault(key, len(self.ids))
 
 
 def unfold_pipeline(tree, deepcopy=False):
@@ -171,84 +167,53 @@ def unfold_pipeline(tree, deepcopy=False):
 
 
 def fold_pipeline(data):
-    data = hashable_pipeline(data)
-    tree = {}
+    table = PointTable()
+    # trie over point ids, node is [payloads, children by id],
+    # payload is the first point which reached the node
+    root = {}
 
-    for item in data:
-        cursor = tree
+    for item in data.values():
+        children = root
         for point in item:
-            cursor.setdefault((point, ), {})
-            cursor = cursor[(point, )]
-
-    def reduce_tree(tree):
-        for key in list(tree.keys()):
-            reduce_tree(tree[key])
-            sub_keys = list(tree[key].keys())
-            if len(sub_keys) == 1:
-                sub_key = sub_keys[0]
-                tree[key + sub_key] = tree[key][sub_key]
-                tree.pop(key)
-
-    def transform_tree(tree, index=()):
+            point_id = table.intern(point)
+            node = children.get(point_id)
+            if node is None:
+                node = children[point_id] = [[point], {}]
+            children = node[1]
+
+    def compress(children):
+        # chains of single children are merged into one node,
+        # merged nodes follow branching ones in order of appearance
+        branching, merged = [], []
+        for payloads, node_children in children.values():
+            compressed = compress(node_children)
+            if len(compressed) == 1:
+                merged.append((payloads + compressed[0][0], compressed[0][1]))
+            else:
+                branching.append((payloads, compressed))
+        return branching + merged
+
+    def transform_tree(nodes, index=()):
         data = {}
-        for i, key in enumerate(tree.keys(), start=1):
+        for i, (payloads, children) in enumerate(nodes, start=1):
             item_index = index + (i,)
+            branch = '.'.join([str(i) for i in item_index])
 
             item = []
-            for point in key:
-                point.payload.setdefault('_meta', {})
-                point.payload['_meta']['branch'] = '.'.join([str(i) for i in item_index])
-                item.append(point.payload)
+            for payload in payloads:
+                payload.setdefault('_meta', {})
+                payload['_meta']['branch'] = branch
+                item.append(payload)
 
-            children = transform_tree(tree[key], item_index)
+            children = transform_tree(children, item_index)
             if children:
                 item.append(children)
 
-            name = [str(i) for i in item_index]
-            data['WORKFLOW-w%s' % '.'.join(name)] = item
+            data['WORKFLOW-w%s' % branch] = item
 
         return data
 
-    reduce_tree(tree)
-    return transform_tree(tree)
-
-
-def get_flows(tree):
-    flows = []
-    if not tree:
-        return flows
-
-    for key in tree:
-        sub_flows = None
-        for point in tree[key]:
-            if '_point' not in point:
-                sub_flows = get_flows(point)
-                if sub_flows:
-                    for sub_flow in sub_flows:
-                        flows.append([key] + sub_flow)
-                else:
-                    flows.append([key])
-        if sub_flows is None:
-            flows.append([key])
-
-    return flows
-
-
-def load_flow(data, flow):
-    def collapse(data, dep=0):
-        result = []
-        for item in data:
-            if '_point' in item:
-                result.append(item.copy())
-            else:
-                key = flow[dep]
-                value = item[key]
-
-                result.extend(
-                    collapse(value, dep + 1)
-                )
-        return result
-    return collapse(data[flow[0]], dep=1)
+    return transform_tree(compress(root))
 
 
 def remove_meta(tree):
@@ -1,6 +1,14 @@
+import os
+from functools import lru_cache
+from unittest.mock import ANY
+
 import requests
 import yaml
-from apitests.utils import search
+from apitests.utils import (
+    YAMLDumper,
+    YAMLLoader,
+    select_path,
+)
 
 try:
     import requests_mock as base_requests_mock
@@ -13,10 +21,15 @@ except ImportError:
     deepdiff = None
 
 try:
-    from jinja2 import Environment, BaseLoader
+    from jinja2 import (
+        Environment,
+        FileSystemBytecodeCache,
+        FileSystemLoader,
+    )
 except ImportError:
     Environment = None
-    BaseLoader = None
+    FileSystemBytecodeCache = None
+    FileSystemLoader = None
 
 try:
     import uncurl
@@ -33,6 +46,10 @@ __all__ = (
     'uncurl_parse',
     'uncurl_parse_context',
     'render_string',
+    'render_file',
+    'stream_file',
+    'pyrepr',
+    'pystr',
     'yaml_loads',
     'yaml_dumps',
 )
@@ -53,36 +70,76 @@ def uncurl_parse_context(curl):
     return uncurl.parse_context(curl)
 
 
+TEMPLATES_PATH = os.path.join(os.path.dirname(__file__), 'jinja2', 'apitests')
+
+
+def pyrepr(value):
+    # python literal, 'ANY' placeholders are rendered as `unittest.mock.ANY`
+    if value is ANY or (isinstance(value, str) and value == 'ANY'):
+        return 'ANY'
+    if isinstance(value, dict):
+        return '{%s}' % ', '.join('%s: %s' % (pyrepr(k), pyrepr(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return '[%s]' % ', '.join(pyrepr(v) for v in value)
+    if isinstance(value, tuple):
+        items = [pyrepr(v) for v in value]
+        return '(%s,)' % items[0] if len(items) == 1 else '(%s)' % ', '.join(items)
+    return repr(value)
+
+
+def pystr(value):
+    if isinstance(value, str):
+        return value
+    return pyrepr(value)
+
+
+@lru_cache(maxsize=None)
+def get_environment(search_path=TEMPLATES_PATH):
+    environment = Environment(
+        loader=FileSystemLoader(search_path),
+        bytecode_cache=FileSystemBytecodeCache(),
+    )
+    environment.filters.update({
+        'pyrepr': pyrepr,
+        'pystr': pystr,
+    })
+    return environment
+
+
+@lru_cache(maxsize=128)
+def get_string_template(val):
+    return get_environment().from_string(val)
+
+
+def get_file_template(path):
+    path = os.path.abspath(path)
+    return get_environment(os.path.dirname(path)).get_template(os.path.basename(path))
+
+
 def render_string(val, context={}):
-    template = Environment(loader=BaseLoader).from_string(val)
-    return template.render(**context)
+    return get_string_template(val).render(**context)
 
 
-def yaml_loads(data):
-    return yaml.load(data, Loader=yaml.Loader)
+def render_file(path, context={}):
+    return get_file_template(path).render(**context)
 
 
-def yaml_dumps(data, **options):
-    return yaml.safe_dump(data, **options)
+def stream_file(path, output_path, context={}):
+    # rendered chunks are written as they are produced
+    get_file_template(path).stream(**context).dump(output_path)
 
 
-def select_path(paths, path):
-    max_path_size = 0
-    result = None
-    for path_pattern in paths:
-        if path_pattern == path:
-            return path_pattern
+def yaml_loads(data):
+    return yaml.load(data, Loader=YAMLLoader)
 
-        if search(path_pattern, path) and len(path_pattern) > max_path_size:
-            result = path_pattern
-            max_path_size = len(path_pattern)
 
-    return result
+def yaml_dumps(data, **options):
+    return yaml.dump(data, Dumper=YAMLDumper, **options)
 
 
-def request_point(point, base_url=None, session=None):
+def request_point(point, base_url=None, session=None, **kwargs):
     point_raw = point.raw
-    url = point_raw['path']
+    url = (base_url or '') + point_raw['path']
     headers = {}
     for key, value in point_raw.get('headers', {}).items():
         if isinstance(value, int):
@@ -95,8 +152,8 @@ def request_point(point, base_url=None, session=None):
         session = requests
 
     response = session.request(
-        point_raw['method'], url, params=point_raw.get('query'),
-        data=point_raw.get('data'), headers=headers
+        point_raw['method'], url, params=point_raw.get('params'),
+        data=point_raw.get('data'), headers=headers, **kwargs
     )
     return response
 
@@ -32,51 +32,51 @@ class AutoGen{{ self_class[1] }}(
     def test_smoke(self):
         self.run_workflow()
 {% for name, pipeline, prompt, context in pipelines %}
-    def test_{{ loop.index0 }}_{{ pipeline.0.meta.prefix }}{{ name }}(self):
+    def {{ pipeline.0.meta.test_name }}(self):
         self.run_workflow([
         {%- for item in pipeline %}
         {%- if item._point == 'api' %}
             points.PointApi(
-                method='{{ item.method }}', path='{{ item.path }}',
+                method={{ item.method|pyrepr }}, path={{ item.path|pyrepr }},
                 {%- if item.params %}
-                params={{ item.params }},{% endif %}
+                params={{ item.params|pyrepr }},{% endif %}
                 {%- if item.data %}
-                data={{ item.data }},{% endif %}
+                data={{ item.data|pyrepr }},{% endif %}
                 {%- if item.headers %}
-                headers={{ item.headers }},{% endif %}
+                headers={{ item.headers|pyrepr }},{% endif %}
                 {%- if item.content %}
-                response_content={{ item.content }},{% endif %}
+                response_content={{ item.content|pyrepr }},{% endif %}
                 {%- if item.response_headers %}
-                response_headers={{ item.response_headers }},{% endif %}
+                response_headers={{ item.response_headers|pyrepr }},{% endif %}
                 response_status={{ item.status }}
             ),
         {%- elif item._point == 'input_mq' %}
             points.InputMQ(
-                exchange='{{ item.exchange }}', routing_key='{{ item.routing_key }}',
+                exchange={{ item.exchange|pyrepr }}, routing_key={{ item.routing_key|pyrepr }},
                 {%- if item.data %}
-                data={{ item.data }},{% endif %}
+                data={{ item.data|pyrepr }},{% endif %}
                 {%- if item.headers %}
-                headers={{ item.headers }},{% endif %}
+                headers={{ item.headers|pyrepr }},{% endif %}
             ),
         {%- elif item._point == 'mq' %}
             points.PointMQ(
-                exchange='{{ item.exchange }}', routing_key='{{ item.routing_key }}',
+                exchange={{ item.exchange|pyrepr }}, routing_key={{ item.routing_key|pyrepr }},
                 {%- if item.data %}
-                data={{ item.data }},{% endif %}
+                data={{ item.data|pyrepr }},{% endif %}
                 {%- if item.headers %}
-                headers={{ item.headers }},{% endif %}
+                headers={{ item.headers|pyrepr }},{% endif %}
             ),
         {%- elif item._point == 'external_api' and not item.is_used %}
             points.PointExternalApi(
-                service='{{ item._service }}', method='{{ item.method }}', path='{{ item.path }}',
+                service={{ item._service|pyrepr }}, method={{ item.method|pyrepr }}, path={{ item.path|pyrepr }},
                 {%- if item.params %}
-                params={{ item.params }},{% endif %}
+                params={{ item.params|pyrepr }},{% endif %}
                 {%- if item.data %}
-                data={{ item.data }},{% endif %}
+                data={{ item.data|pyrepr }},{% endif %}
             ),
-            points.PointStubAlias('{{ item.prompt }}'),
+            points.PointStubAlias({{ item.prompt|pyrepr }}),
         {%- elif item._point == 'external_api' %}
-            points.PointStubAlias('{{ item.prompt }}'),
+            points.PointStubAlias({{ item.prompt|pyrepr }}),
         {%- elif item._point == 'assert' %}
             points.PointAssert(self.{{ item.path }}),
         {%- elif item._point == 'context' %}
@@ -85,10 +85,10 @@ class AutoGen{{ self_class[1] }}(
             points.Process(self.{{ item.path }}),
         {%- elif item._point == 'notification' %}
             points.PointNotification(
-                data={{ item.data }}
+                data={{ item.data|pyrepr }}
             ),
         {%- elif item._point == 'log' and item.pattern != 'ANY' %}
-            points.PointLog('{{ item.method }}', '{% if item.path != 'ANY' and item.path|length < 150 %}{{ item.path }}{% else %}{{ item.pattern }}{% endif %}'),
+            points.PointLog({{ item.method|pyrepr }}, {% if item.path != 'ANY' and item.path|length < 150 %}{{ item.path|pyrepr }}{% else %}pattern={{ item.pattern|pyrepr }}{% endif %}),
         {%- endif %}
         {%- endfor %}
         ])
@@ -6,38 +6,38 @@
 {%- for item in pipeline %}
 
 {% if item._point == 'api' -%}
-{{ loop.index }}. API request {{ item.method }} {{ item.path }} {% if item.params %}with query params: {{ item.params }}{% endif %}
+{{ loop.index }}. API request {{ item.method }} {{ item.path }} {% if item.params %}with query params: {{ item.params|pystr }}{% endif %}
 
 {%- if item.data %}
-Request data: {{ item.data }}{% endif %}
+Request data: {{ item.data|pystr }}{% endif %}
 {%- if item.headers %}
-Request headers: {{ item.headers }}{% endif %}
+Request headers: {{ item.headers|pystr }}{% endif %}
 {%- if item.content %}
-Response content: {{ item.content }}{% endif %}
+Response content: {{ item.content|pystr }}{% endif %}
 {%- if item.response_headers %}
-Response headers: {{ item.response_headers }},{% endif %}
+Response headers: {{ item.response_headers|pystr }},{% endif %}
 Response status: {{ item.status }}
 
 {% elif item._point == 'input_mq' -%}
 {{ loop.index }}. Input MQ (exchange: {{ item.exchange }}, routing_key: {{ item.routing_key }})
-Data: {{ item.data }}
+Data: {{ item.data|pystr }}
 
 {% elif item._point == 'mq' -%}
 {{ loop.index }}. MQ (exchange: {{ item.exchange }}, routing_key: {{ item.routing_key }})
-exchange='{{ item.exchange }}', routing_key='{{ item.routing_key }}',
-Data: {{ item.data }}
+exchange={{ item.exchange|pyrepr }}, routing_key={{ item.routing_key|pyrepr }},
+Data: {{ item.data|pystr }}
 
 {% elif item._point == 'external_api' -%}
-{{ loop.index }}. External API request in service "{{ item._service }}" method:{{ item.method }} path:{{ item.path }} {% if item.params %}with query params: {{ item.params }}{% endif %}
+{{ loop.index }}. External API request in service "{{ item._service }}" method:{{ item.method }} path:{{ item.path }} {% if item.params %}with query params: {{ item.params|pystr }}{% endif %}
 
 {%- if item.data %}
-Request data: {{ item.data }}{% endif %}
+Request data: {{ item.data|pystr }}{% endif %}
 {%- if item.headers %}
-Request headers: {{ item.headers }}{% endif %}
+Request headers: {{ item.headers|pystr }}{% endif %}
 {%- if item.content %}
-Response content: {{ item.content }}{% endif %}
+Response content: {{ item.content|pystr }}{% endif %}
 {%- if item.response_headers %}
-Response headers: {{ item.response_headers }},{% endif %}
+Response headers: {{ item.response_headers|pystr }},{% endif %}
 Response status: {{ item.status }}
 
 {% elif item._point == 'context' -%}
@@ -48,7 +48,7 @@ Response status: {{ item.status }}
 
 {% elif item._point == 'notification' -%}
 {{ loop.index }}. Notification
-Data: {{ item.data }}
+Data: {{ item.data|pystr }}
 
 {% elif item._point == 'log' and item.pattern != 'ANY' -%}
 {{ loop.index }}. Log message
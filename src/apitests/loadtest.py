@@ -0,0 +1,268 @@
+"""
+Load-test mode
+
+Replays input points (`PointApi`) of `.apiflows.yaml` branches concurrently
+against a running app and reports latency histograms and error rates
+per workflow branch:
+
+    python -m apitests.loadtest tests/test_autogen_example.apiflows.yaml \
+        --target http://127.0.0.1:8000 --concurrency 20 --rate 200 --duration 30 \
+        --stubs tests/apistubs.yaml
+
+External calls of the app are served by the Active Stub Server (`--stubs`)
+with stub aliases of the branch. Branches then run one after another,
+each for its share of `--duration`, otherwise they run concurrently.
+Connection failures are reported apart from unexpected statuses.
+"""
+
+import argparse
+import asyncio
+import bisect
+import itertools
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .helpers import request_point
+from .points import (
+    PointApi,
+    Workflow,
+)
+from .utils import (
+    get_flows,
+    load_flow,
+)
+
+__all__ = (
+    'LatencyHistogram',
+    'LoadTest',
+    'load_branches',
+    'main',
+)
+
+
+class LatencyHistogram:
+    """
+    Log-linear buckets with ~5% precision from 10us to 100s
+    """
+
+    precision = 1.05
+    lowest = 1e-5
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.errors = 0
+        # connection failures, no response
+        self.failures = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def bucket(self, value):
+        return max(0, int(math.log(max(value, self.lowest) / self.lowest, self.precision)))
+
+    def add(self, value, error=False, failure=False):
+        index = self.bucket(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.errors += int(error)
+        self.failures += int(failure)
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.errors += other.errors
+        self.failures += other.failures
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent):
+        if not self.count:
+            return 0.0
+        indexes = sorted(self.counts)
+        cumulative = list(itertools.accumulate(self.counts[index] for index in indexes))
+        position = bisect.bisect_left(cumulative, math.ceil(self.count * percent / 100))
+        return min(self.lowest * self.precision ** (indexes[position] + 1), self.max)
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'error_rate': self.errors / self.count if self.count else 0.0,
+            'failures': self.failures,
+            'failure_rate': self.failures / self.count if self.count else 0.0,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+
+def load_branches(path):
+    """
+    Return [(branch, [PointApi, ...], [stub alias, ...])] for branches with input points
+    """
+    tree = Workflow.load_from_file(path)
+    branches = []
+    for flow in get_flows(tree):
+        items = load_flow(tree, flow)
+        inputs = [
+            PointApi(
+                item['method'], item['path'],
+                params=item.get('params'), data=item.get('data'), headers=item.get('headers'),
+                response_status=item.get('status'), response_content=item.get('content')
+            )
+            for item in items
+            if item['_point'] == PointApi.name
+        ]
+        aliases = list(dict.fromkeys(item['prompt'] for item in items if item.get('prompt')))
+        if inputs:
+            branches.append((flow[-1], inputs, aliases))
+    return branches
+
+
+class LoadTest:
+    def __init__(
+        self, branches, target, concurrency=10, rate=None, duration=10.0,
+        timeout=10.0, stub_server=None
+    ):
+        self.branches = branches
+        self.target = target.rstrip('/')
+        self.concurrency = concurrency
+        self.rate = rate
+        self.duration = duration
+        self.timeout = timeout
+        # in-process `StubServer`, branch aliases are applied to it
+        self.stub_server = stub_server
+
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def next_job(self, phase):
+        branches, started, duration, counter = phase
+        with self.lock:
+            index = next(counter)
+        if self.rate:
+            delay = started + index / self.rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        if time.monotonic() - started >= duration:
+            return None
+        return branches[index % len(branches)]
+
+    def session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def call(self, point):
+        started = time.perf_counter()
+        try:
+            response = request_point(point, base_url=self.target, session=self.session(), timeout=self.timeout)
+        except requests.RequestException:
+            return time.perf_counter() - started, False, True
+        # status 0 is recorded for calls without response
+        error = bool(point.response_status) and response.status_code != point.response_status
+        return time.perf_counter() - started, error, False
+
+    def worker(self, phase):
+        histograms = {}
+        while True:
+            job = self.next_job(phase)
+            if job is None:
+                return histograms
+            branch, inputs = job[:2]
+            histogram = histograms.setdefault(branch, LatencyHistogram())
+            for point in inputs:
+                latency, error, failure = self.call(point)
+                histogram.add(latency, error=error, failure=failure)
+                if error or failure:
+                    break
+
+    def run_phase(self, branches, duration, report):
+        phase = (branches, time.monotonic(), duration, itertools.count())
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            for histograms in executor.map(self.worker, [phase] * self.concurrency):
+                for branch, histogram in histograms.items():
+                    report.setdefault(branch, LatencyHistogram()).merge(histogram)
+
+    def run(self):
+        report = {}
+        if not self.branches:
+            return report
+        if self.stub_server is None:
+            self.run_phase(self.branches, self.duration, report)
+            return report
+
+        # stubs answer by aliases of one branch at a time
+        try:
+            for branch in self.branches:
+                self.stub_server.aliases = list(branch[2])
+                self.run_phase([branch], self.duration / len(self.branches), report)
+        finally:
+            self.stub_server.aliases = []
+        return report
+
+
+def start_stub_server(stubs, port):
+    from .server import StubServer
+
+    server = StubServer(stubs, port=port)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server
+
+
+def render_report(report):
+    lines = ['%-32s %8s %7s %9s %9s %9s %9s %9s' % (
+        'branch', 'count', 'errors', 'failures', 'p50 ms', 'p90 ms', 'p99 ms', 'max ms'
+    )]
+    for branch, histogram in sorted(report.items()):
+        summary = histogram.summary()
+        lines.append('%-32s %8d %6.1f%% %8.1f%% %9.2f %9.2f %9.2f %9.2f' % (
+            branch, summary['count'], summary['error_rate'] * 100, summary['failure_rate'] * 100,
+            summary['p50'] * 1000, summary['p90'] * 1000, summary['p99'] * 1000, summary['max'] * 1000,
+        ))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay apiflows input points as concurrent traffic')
+    parser.add_argument('apiflows', help='path to .apiflows.yaml')
+    parser.add_argument('--target', required=True, help='base url of the tested app')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--rate', type=float, default=None, help='branches per second, unlimited by default')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds')
+    parser.add_argument('--timeout', type=float, default=10.0, help='request timeout, seconds')
+    parser.add_argument('--stubs', default=None, help='serve external calls by apistubs.yaml')
+    parser.add_argument('--stubs-port', type=int, default=8765)
+    parser.add_argument('--json', action='store_true', help='print report as json')
+    args = parser.parse_args(argv)
+
+    stub_server = None
+    if args.stubs:
+        stub_server = start_stub_server(args.stubs, args.stubs_port)
+
+    load_test = LoadTest(
+        load_branches(args.apiflows), args.target,
+        concurrency=args.concurrency, rate=args.rate,
+        duration=args.duration, timeout=args.timeout, stub_server=stub_server
+    )
+    report = load_test.run()
+    if args.json:
+        print(json.dumps({branch: histogram.summary() for branch, histogram in report.items()}, indent=2))
+    else:
+        print(render_report(report))
+
+
+if __name__ == '__main__':
+    main()
@@ -32,10 +32,11 @@ Frozen Points are used for tests from apistubs notation:
 
 import copy
 import json
-
-import yaml
+import threading
+from collections import deque
 
 from .settings import OPENTELEMETRY_ENABLED
+from .utils import load_yaml_file
 
 __all__ = (
     'Workflow',
@@ -99,27 +100,72 @@ class Method:
 
 
 class Workflow:
-    def __init__(self, data, context=None, stubs_data=None, e2e=False):
+    # order of matching concurrent calls of the same route:
+    # `fifo` - in order of arrival, `request` - first point matched
+    # by the request (path, params and data) then in order of arrival
+    ORDERING_FIFO = 'fifo'
+    ORDERING_REQUEST = 'request'
+
+    def __init__(
+        self, data, context=None, stubs_data=None, e2e=False, compiled=None,
+        ordering=ORDERING_FIFO
+    ):
         self.points = data
         self.context = context
         self.stubs = stubs_data
+        # precompiled routes and bodies, see `apitests.replay`
+        self.compiled = compiled
         self.stubs_modified = False
         self.tracer = tracer
         self.e2e = e2e
 
+        # uncalled external calls: all of them in order and
+        # FIFO queues by (service, method, pattern), see `index_points`
+        self.pending = None
+        self.queues = None
+        self.uncalled_count = 0
+
+        self.ordering = ordering
+        self.lock = threading.RLock()
+
     @classmethod
     def load_from_file(cls, path):
         try:
-            with open(path) as points_file:
-                data = points_file.read()
-                return yaml.load(data, Loader=yaml.Loader)
+            return load_yaml_file(path)
         except FileNotFoundError:
             return {}
 
+    @staticmethod
+    def is_external_call(point):
+        return point.role == Role.OUTPUT and point.method in Method.HTTP_GROUP
+
+    def index_points(self):
+        """
+        Index uncalled external calls by (service, method, pattern).
+        Must be called again after patterns or `called` flags are changed outside.
+        """
+        self.pending = deque()
+        self.queues = {}
+        for point in self.points:
+            if not self.is_external_call(point) or point.called:
+                continue
+            self.pending.append(point)
+            key = (point.service, point.method, point.pattern)
+            self.queues.setdefault(key, deque()).append(point)
+        self.uncalled_count = len(self.pending)
+
+    def has_uncalled_calls(self):
+        if self.queues is None:
+            return bool(self.get_external_calls(called=False))
+        return self.uncalled_count > 0
+
     def get_external_calls(self, called=None):
+        if called is False and self.queues is not None:
+            return [point for point in self.pending if not point.called]
+
         points = []
         for point in self.points:
-            if point.role != Role.OUTPUT or point.method not in Method.HTTP_GROUP:
+            if not self.is_external_call(point):
                 continue
             if called is True and not point.called:
                 continue
@@ -130,9 +176,57 @@ class Workflow:
 
         return points
 
-    def get_reponse(self, service, method, pattern, explicit=False):
+    def get_reponse(self, service, method, pattern, explicit=False, match=None):
+        """
+        `match(point)` selects a point of the route for `request` ordering
+        """
+        with self.lock:
+            if self.queues is None:
+                return self.get_reponse_scan(service, method, pattern, explicit=explicit)
+            return self.get_reponse_indexed(service, method, pattern, explicit=explicit, match=match)
+
+    def pop_queued(self, queue, match=None):
+        if self.ordering == self.ORDERING_REQUEST and match:
+            for index, point in enumerate(queue):
+                if not point.called and match(point):
+                    del queue[index]
+                    return point
+        return queue.popleft()
+
+    def get_reponse_indexed(self, service, method, pattern, explicit=False, match=None):
+        while self.pending and self.pending[0].called:
+            self.pending.popleft()
+
+        if explicit and self.pending:
+            point = self.pending[0]
+            if (point.service, point.method, point.pattern) != (service, method, pattern):
+                raise NotImplementedError(
+                    'Invalid point for request '
+                    'service (%s), method(%s), pattern (%s).'
+                    'point %s' % (service, method, pattern, point.raw)
+                )
+
+        queue = self.queues.get((service, method, pattern))
+        while queue and queue[0].called:
+            queue.popleft()
+
+        if queue:
+            point = self.pop_queued(queue, match)
+            point.called = True
+            self.uncalled_count -= 1
+            return point.response_status, point.response_content, point
+
+        if explicit:
+            raise NotImplementedError(
+                'PointExternalApi does exist in pipeline: '
+                'servise (%s), method(%s), pattern (%s).' % (service, method, pattern,)
+            )
+
+        return None, None, None
+
+    def get_reponse_scan(self, service, method, pattern, explicit=False):
         for point in self.points:
-            if point.role != Role.OUTPUT or point.method not in Method.HTTP_GROUP:
+            if not self.is_external_call(point):
                 continue
 
             if point.called:
@@ -318,7 +412,7 @@ class PointLog(BasePoint):
     name = 'log'
     role = Role.LOG
 
-    def __init__(self, level, msg, pattern=None):
+    def __init__(self, level, msg='', pattern=None):
         super().__init__(
             method=level, path=msg, pattern=pattern
         )
@@ -0,0 +1,96 @@
+"""
+Precompiled replay workflows
+
+The generator resolves stub patterns and serializes stub responses once,
+replay tests reuse them without per-test pattern matching.
+Artifact is a json file keyed by content hashes of tests and stubs files,
+it is dropped silently when any of them is changed.
+"""
+
+import hashlib
+import json
+
+__all__ = (
+    'REPLAY_VERSION',
+    'compile_workflows',
+    'dump_replay',
+    'load_replay',
+)
+
+REPLAY_VERSION = 2
+
+
+def file_version(path):
+    with open(path, 'rb') as source_file:
+        return hashlib.sha256(source_file.read()).hexdigest()
+
+
+def compile_workflows(pipelines, data):
+    """
+    Map test name to resolved routes {(service, method, path): pattern}
+    and collect encoded bodies {(service, method, pattern, key): bytes}
+    """
+    tests = {}
+    bodies = {}
+    for _, pipeline, _, _ in pipelines:
+        routes = {}
+        for item in pipeline:
+            if item['_point'] != 'external_api' or 'path' not in item:
+                continue
+            service, method = item['_service'], item['method']
+            pattern, options = data.get_pattern_data(service, item['path'], method=method)
+            if not options:
+                continue
+            routes[(service, method, item['path'])] = pattern
+            for key in options:
+                bodies[(service, method, pattern, key)] = data.get_body(service, method, pattern, key)
+        tests[pipeline[0]['meta']['test_name']] = routes
+    return tests, bodies
+
+
+def dump_replay(path, tests, bodies, tests_file, stubs_file):
+    with open(path, 'w') as replay_file:
+        json.dump({
+            'version': REPLAY_VERSION,
+            'tests_file': file_version(tests_file),
+            'stubs_file': file_version(stubs_file),
+            'tests': {
+                name: [list(route) + [pattern] for route, pattern in routes.items()]
+                for name, routes in tests.items()
+            },
+            'bodies': [
+                list(key) + [body.decode('utf-8') if body is not None else None]
+                for key, body in bodies.items()
+            ],
+        }, replay_file)
+
+
+def load_replay(path, tests_file, stubs_file):
+    """
+    Return {test name: {'routes': ..., 'bodies': ...}} or None if stale
+    """
+    try:
+        with open(path) as replay_file:
+            replay = json.load(replay_file)
+        if (
+            replay['version'] != REPLAY_VERSION or
+            replay['tests_file'] != file_version(tests_file) or
+            replay['stubs_file'] != file_version(stubs_file)
+        ):
+            return None
+
+        bodies = {
+            (service, method, pattern, key): body.encode('utf-8') if body is not None else None
+            for service, method, pattern, key, body in replay['bodies']
+        }
+        tests = {
+            name: {(service, method, path): pattern for service, method, path, pattern in routes}
+            for name, routes in replay['tests'].items()
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+    return {
+        name: {'routes': routes, 'bodies': bodies}
+        for name, routes in tests.items()
+    }
@@ -0,0 +1,241 @@
+"""
+Active Stub Server
+
+Standalone asyncio HTTP/1.1 server with keep-alive over the `Stubs` engine
+for out-of-process apps and load generators:
+
+    python -m apitests.server tests/apistubs.yaml --port 8765
+
+Requests `/{service}/{path}` are answered by apistubs notation.
+Stub aliases are selected per request by `X-Apitests-Alias: ok,not_found`
+header or per test through the control API:
+
+    PUT    /__apitests__/workflow  {"prompt": [...], "points": [...]}
+    GET    /__apitests__/workflow  uncalled points and left prompt
+    DELETE /__apitests__/workflow
+    PUT    /__apitests__/aliases   ["ok", "not_found"], applied to every request
+    POST   /__apitests__/reload
+"""
+
+import argparse
+import asyncio
+import json
+from http import HTTPStatus
+from urllib.parse import (
+    parse_qs,
+    urlsplit,
+)
+
+from .points import (
+    PointExternalApi,
+    Workflow,
+)
+from .stub import Stubs
+
+__all__ = (
+    'ALIAS_HEADER',
+    'CONTROL_PREFIX',
+    'StubServer',
+    'main',
+)
+
+ALIAS_HEADER = 'x-apitests-alias'
+CONTROL_PREFIX = '/__apitests__'
+WORKFLOW_KEYS = frozenset(('prompt', 'points'))
+POINT_KEYS = frozenset(('_service', 'method', 'path'))
+
+
+class StubServer:
+    stubs_class = Stubs
+
+    def __init__(self, stubs_path, host='127.0.0.1', port=8765):
+        self.stubs_path = stubs_path
+        self.host = host
+        self.port = port
+        self.server = None
+        self.stubs = self.stubs_class(data=self.stubs_class.config(stubs_path))
+        # aliases of every request without the alias header, they are not consumed
+        self.aliases = []
+        self.reset_workflow()
+
+    def reset_workflow(self):
+        self.stubs.pipeline = None
+        self.stubs.prompt = []
+
+    def set_workflow(self, prompt=None, points=None):
+        self.stubs.prompt = list(prompt or [])
+        self.stubs.pipeline = None
+        if points:
+            self.stubs.pipeline = Workflow(
+                [
+                    PointExternalApi(
+                        item['_service'], item['method'], item['path'],
+                        params=item.get('params'), data=item.get('data'),
+                        response_status=item.get('status'), response_content=item.get('content')
+                    )
+                    for item in points
+                ],
+                ordering=Workflow.ORDERING_REQUEST
+            )
+            self.stubs.index_pipeline()
+
+    def get_workflow(self):
+        pipeline = self.stubs.pipeline
+        return {
+            'prompt': self.stubs.prompt,
+            'points': [point.raw for point in pipeline.get_external_calls(called=False)] if pipeline else [],
+        }
+
+    def control(self, method, path, data):
+        if path == '/workflow':
+            if method in ('PUT', 'POST'):
+                data = data or {}
+                if not isinstance(data, dict) or set(data) - WORKFLOW_KEYS:
+                    return 400, {'error': 'Workflow keys are %s' % sorted(WORKFLOW_KEYS)}
+                if not all(isinstance(item, dict) and POINT_KEYS <= set(item) for item in data.get('points') or []):
+                    return 400, {'error': 'Points require %s' % sorted(POINT_KEYS)}
+                self.set_workflow(**data)
+            elif method == 'DELETE':
+                self.reset_workflow()
+            return 200, self.get_workflow()
+        if path == '/aliases' and method in ('PUT', 'POST'):
+            if not isinstance(data or [], list):
+                return 400, {'error': 'Aliases are a list'}
+            self.aliases = list(data or [])
+            return 200, self.aliases
+        if path == '/reload' and method == 'POST':
+            self.stubs.data = self.stubs_class.config(self.stubs_path)
+            return 200, {}
+        return 404, {'error': 'Unknown control endpoint %s %s' % (method, path)}
+
+    def respond(self, method, service, path, params=None, data=None, prompt=None):
+        stubs = self.stubs
+        with stubs.lock:
+            pattern, options = stubs.get_request_pattern(service, path, method)
+            if not options:
+                return 404, json.dumps({
+                    'error': 'Unexpected api call. Service (%s), method (%s), path (%s)' % (service, method, path)
+                }).encode()
+
+            if stubs.pipeline:
+                status, content, _ = stubs.pipeline.get_reponse(
+                    service, method, pattern,
+                    match=lambda point: stubs.is_same_request(point, path, params=params, data=data)
+                )
+                if status is not None:
+                    return status, json.dumps(content or {}).encode()
+
+            return stubs.get_response_body(service, method, pattern, options, prompt=prompt)
+
+    def dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        control = url.path.startswith(CONTROL_PREFIX)
+        data = None
+        if body:
+            try:
+                data = json.loads(body)
+            except ValueError:
+                if control:
+                    return 400, json.dumps({'error': 'Control body is not json'}).encode()
+                data = self.stubs.normalize_query(parse_qs(body.decode()))
+
+        if control:
+            status, content = self.control(method, url.path[len(CONTROL_PREFIX):], data)
+            return status, json.dumps(content).encode()
+
+        service, _, path = url.path.lstrip('/').partition('/')
+        prompt = None
+        if ALIAS_HEADER in headers:
+            prompt = [alias.strip() for alias in headers[ALIAS_HEADER].split(',')]
+        elif self.aliases:
+            prompt = list(self.aliases)
+        params = self.stubs.normalize_query(parse_qs(url.query)) or None
+        return self.respond(method.lower(), service, '/' + path, params=params, data=data, prompt=prompt)
+
+    @staticmethod
+    async def read_body(reader, headers):
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0], 16)
+                if not size:
+                    await reader.readline()
+                    return b''.join(chunks)
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+        return await reader.readexactly(int(headers.get('content-length', 0)))
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, value = line.decode('latin-1').split(':', 1)
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await self.read_body(reader, headers)
+                try:
+                    status, payload = self.dispatch(method, target, headers, body)
+                except Exception as e:
+                    status, payload = 500, json.dumps({'error': repr(e)}).encode()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                writer.write(self.render_head(status, len(payload), keep_alive))
+                writer.write(payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def render_head(status, length, keep_alive):
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = ''
+        return (
+            f'HTTP/1.1 {status} {reason}\r\n'
+            f'Content-Type: application/json\r\n'
+            f'Content-Length: {length}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'
+        ).encode('latin-1')
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Active Stub Server by apistubs notation')
+    parser.add_argument('stubs', help='path to apistubs.yaml')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    server = StubServer(args.stubs, host=args.host, port=args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+import os
 import sys
 
 try:
@@ -16,6 +17,14 @@ __all__ = (
     'AUTOGEN_MAX_TESTS',
     'PROJECT',
     'GENERATOR_MODE',
+    'YAML_CACHE',
+    'LLM_CACHE',
+    'LLM_CACHE_TTL',
+    'LLM_CACHE_SIZE',
+    'LLM_URL',
+    'LLM_MODEL',
+    'LLM_CONCURRENCY',
+    'LLM_BATCH_SIZE',
 )
 
 AUTOGEN_MAX_TESTS = 100
@@ -31,6 +40,26 @@ LOG_DIR = None
 
 STUBS_HOST = None
 
+# pickled cache of loaded apistubs/apiflows files in `__pycache__`
+YAML_CACHE = os.environ.get('APITESTS_YAML_CACHE', '') not in ('', '0')
+
+# disk cache of LLM generated stub payloads, `0` disables it
+LLM_CACHE = os.environ.get(
+    'APITESTS_LLM_CACHE',
+    os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'apitests', 'llm')
+)
+if LLM_CACHE == '0':
+    LLM_CACHE = None
+LLM_CACHE_TTL = float(os.environ['APITESTS_LLM_CACHE_TTL']) if os.environ.get('APITESTS_LLM_CACHE_TTL') else None
+LLM_CACHE_SIZE = int(os.environ.get('APITESTS_LLM_CACHE_SIZE', 100 * 1024 * 1024))
+
+# LLM client for stub payloads, url can point to a local stand-in server
+LLM_DEFAULT_URL = 'https://generativelanguage.googleapis.com/v1beta'
+LLM_URL = os.environ.get('APITESTS_LLM_URL', LLM_DEFAULT_URL)
+LLM_MODEL = os.environ.get('APITESTS_LLM_MODEL')
+LLM_CONCURRENCY = int(os.environ.get('APITESTS_LLM_CONCURRENCY', 4))
+LLM_BATCH_SIZE = int(os.environ.get('APITESTS_LLM_BATCH_SIZE', 8))
+
 if IS_DJANGO_STACK:
     from django.conf import settings as app_settings
     PROJECT = app_settings.PROJECT
@@ -5,8 +5,14 @@ It uses multi libraries patched methods behind opentelemetry wrappers.
 Real opentelemetry traces are produced through tests running.
 """
 
+import asyncio
 import json
+import os
+import threading
 from contextlib import contextmanager
+from functools import lru_cache
+from http import HTTPStatus
+from importlib.util import find_spec
 from unittest.mock import patch
 from urllib.parse import (
     parse_qs,
@@ -15,30 +21,29 @@ from urllib.parse import (
 
 import requests
 import yaml
+from requests.structures import CaseInsensitiveDict
 
 from .utils import (
+    RouteIndex,
+    YAMLDumper,
     force_bytes,
-    select_path,
+    load_yaml_file,
 )
 
-try:
-    from httpcore import Response as HTTPCoreResponse
-except ImportError:
-    HTTP_CORE_ENABLED = False
-else:
-    HTTP_CORE_ENABLED = True
-
-try:
-    import aiohttp
-except ImportError:
-    AIOHTTP_ENABLED = False
-else:
-    AIOHTTP_ENABLED = True
+# clients are imported on first patching, not at import time
+HTTP_CORE_ENABLED = find_spec('httpcore') is not None
+AIOHTTP_ENABLED = find_spec('aiohttp') is not None
 
 
 __all__ = (
     'MockResponse',
+    'MockResponseAsync',
+    'MockStreamReader',
     'Stubs',
+    'StubsData',
+    'StubsRegistry',
+    'stubs_registry',
+    'parse_option_key',
 )
 
 
@@ -46,8 +51,19 @@ class MockResponse(requests.Response):
     def __init__(self, status_code, content):
         super().__init__()
         self.status_code = int(status_code)
+        # encoded bodies are shared with stubs data, not copied
         self._content = force_bytes(content)
 
+    @property
+    def body(self):
+        return memoryview(self._content)
+
+    def json(self, **kwargs):
+        if kwargs:
+            return super().json(**kwargs)
+        # decoded per call, callers may change the result
+        return json.loads(self._content)
+
     async def read(self):
         return self._content
 
@@ -59,24 +75,237 @@ class MockResponse(requests.Response):
         return self.status_code
 
 
-class MockResponseAsync(MockResponse):
-    async def json(self, *args, **keargs):
-        return json.loads(self._content)
+class MockStreamReader:
+    """
+    Stand-in of `aiohttp.StreamReader` over the encoded stub body.
+    Every chunk is served through the event loop.
+    """
+
+    def __init__(self, content, chunk_size=2 ** 16):
+        self._content = memoryview(content)
+        self._offset = 0
+        self.chunk_size = chunk_size
+
+    def at_eof(self):
+        return self._offset >= len(self._content)
+
+    async def read(self, n=-1):
+        await asyncio.sleep(0)
+        end = len(self._content) if n < 0 else self._offset + n
+        chunk = bytes(self._content[self._offset:end])
+        self._offset += len(chunk)
+        return chunk
+
+    async def readany(self):
+        return await self.read(self.chunk_size)
+
+    async def readchunk(self):
+        chunk = await self.readany()
+        return chunk, False
+
+    async def readline(self):
+        await asyncio.sleep(0)
+        end = bytes(self._content[self._offset:]).find(b'\n')
+        end = len(self._content) if end < 0 else self._offset + end + 1
+        line = bytes(self._content[self._offset:end])
+        self._offset = end
+        return line
+
+    async def iter_chunked(self, n):
+        while not self.at_eof():
+            yield await self.read(n)
+
+    async def iter_any(self):
+        while not self.at_eof():
+            yield await self.readany()
+
+    def __aiter__(self):
+        return self._iter_lines()
+
+    async def _iter_lines(self):
+        while not self.at_eof():
+            yield await self.readline()
+
+
+class MockResponseAsync:
+    """
+    Stand-in of `aiohttp.ClientResponse` returned by patched `ClientSession._request`.
+    """
+
+    method = 'GET'
+    url = ''
+
+    def __init__(self, status_code, content):
+        self.status = int(status_code)
+        try:
+            self.reason = HTTPStatus(self.status).phrase
+        except ValueError:
+            self.reason = ''
+        self.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+        self._content = force_bytes(content)
+        self.content = MockStreamReader(self._content)
+        self.closed = False
+
+    @property
+    def status_code(self):
+        return self.status
+
+    @property
+    def ok(self):
+        return self.status < 400
+
+    @property
+    def body(self):
+        return memoryview(self._content)
+
+    async def read(self):
+        await asyncio.sleep(0)
+        return self._content
+
+    async def text(self, encoding='utf-8', errors='strict'):
+        return (await self.read()).decode(encoding, errors)
+
+    async def json(self, *args, loads=None, **kwargs):
+        body = await self.read()
+        if loads is not None:
+            return loads(body.decode())
+        return json.loads(body)
+
+    def raise_for_status(self):
+        if not self.ok:
+            from aiohttp import ClientResponseError
+            raise ClientResponseError(
+                None, (), status=self.status, message=self.reason, headers=self.headers
+            )
+
+    def release(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+    async def wait_for_close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+
+@lru_cache(maxsize=None)
+def parse_option_key(key):
+    # '{status}-{alias}' -> (status, alias)
+    parts = key.split('-')
+    return int(parts[0]), parts[1]
+
+
+class StubsData(dict):
+    """
+    APIStubs notation data with lookup tables:
+    routes by (service, method), options by (service, method, pattern)
+    and encoded option bodies by (service, method, pattern, key).
+    Options must be changed through `add_options` to keep bodies actual.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reindex()
+
+    def reindex(self):
+        self.routes = {}
+        self.options = {}
+        self.bodies = {}
+        for service, methods_paths in self.items():
+            for mp in methods_paths or {}:
+                self.index_options(service, mp)
+
+    def index_options(self, service, mp):
+        method, pattern = mp.split('#', 1)
+        for key in [(service, method), (service, None)]:
+            self.routes.setdefault(key, RouteIndex()).add(pattern)
+
+        options = self[service][mp]
+        self.options[(service, method, pattern)] = options
+        for key, content in (options or {}).items():
+            parse_option_key(key)
+            self.bodies[(service, method, pattern, key)] = json.dumps(content).encode()
+
+    def copy(self):
+        # routes of services are copied, options are shared
+        return StubsData({
+            service: dict(methods_paths or {})
+            for service, methods_paths in self.items()
+        })
+
+    def add_options(self, service, mp, options):
+        self.setdefault(service, {})
+        self[service][mp] = options
+        self.index_options(service, mp)
+
+    def get_pattern_data(self, service, path, method=None):
+        routes = self.routes.get((service, method))
+        if routes is None:
+            return None, None
+
+        pattern = routes.select(path)
+        if method and pattern:
+            return pattern, self.options.get((service, method, pattern))
+        return pattern, None
+
+    def get_body(self, service, method, pattern, key):
+        return self.bodies.get((service, method, pattern, key))
+
+
+yaml.add_representer(StubsData, YAMLDumper.represent_dict, Dumper=YAMLDumper)
+
+
+class StubsRegistry:
+    """
+    Process-wide cache of loaded stubs files shared between test classes.
+    Entries are keyed by loader and path and reloaded when file mtime or size change.
+    Shared data must not be mutated, per-test state lives in `Stubs` instances.
+    """
+
+    def __init__(self):
+        self.items = {}
+
+    def get(self, path, loader):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        # classmethod loaders are bound to the class, subclasses may load differently
+        key = (getattr(loader, '__func__', loader), getattr(loader, '__self__', None), path)
+
+        cached = self.items.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, loader(path))
+            self.items[key] = cached
+        return cached[1]
+
+    def clear(self):
+        self.items.clear()
+
+
+stubs_registry = StubsRegistry()
 
 
 class StubsFileMixin:
     @classmethod
     def config(cls, path):
+        return stubs_registry.get(path, cls.load_config)
+
+    @classmethod
+    def load_config(cls, path):
         data = cls.load_from_file(path)
         data.pop('apistubs', None)
         cls.clear_nodes(data)
-        return data or {}
+        return StubsData(data or {})
 
     @classmethod
     def load_from_file(cls, path):
-        with open(path) as points_file:
-            data = points_file.read()
-            return yaml.load(data, Loader=yaml.Loader)
+        return load_yaml_file(path)
 
     @classmethod
     def clear_nodes(cls, data, dep=0):
@@ -104,6 +333,9 @@ class Stubs(StubsFileMixin):
         assert_requests=False,
         external_services=None
     ):
+        if data is not None and not isinstance(data, StubsData):
+            data = StubsData(data)
+
         self.is_gentests = True
         self.data = data
         self.expexted_points = expexted_points
@@ -116,28 +348,53 @@ class Stubs(StubsFileMixin):
 
         self.external_services = external_services or {}
 
+        # matching state is shared by threads of the tested app
+        self.lock = threading.RLock()
+
     @staticmethod
     def get_pattern_data(data, service, path, method=None):
-        extra = None
-        paths = [mp.split('#')[1] for mp in data.get(service, {})]
-        pattern = select_path(paths, path)
-        if method and pattern:
-            mp = f'{method}#{pattern}'
-            extra = data[service].get(mp)
-        return pattern, extra
+        # `data` is indexed `StubsData`, see `Stubs.__init__`
+        return data.get_pattern_data(service, path, method=method)
 
-    def select_response(self, options):
+    def select_option(self, options, prompt=None):
+        if prompt is None:
+            prompt = self.prompt
         content_key = None
         for key in options:
             if not content_key:
                 content_key = key
-            stub_alias = key.split('-')[1]
-            if stub_alias in self.prompt:
+            _, stub_alias = parse_option_key(key)
+            if stub_alias in prompt:
                 content_key = key
-                self.prompt.remove(stub_alias)
-        content = options[content_key]
-        status = int(content_key.split('-')[0])
-        return status, content
+                prompt.remove(stub_alias)
+        return content_key
+
+    def select_response(self, options):
+        content_key = self.select_option(options)
+        status, _ = parse_option_key(content_key)
+        return status, options[content_key]
+
+    def get_request_pattern(self, service, path, method):
+        compiled = self.pipeline.compiled if self.pipeline else None
+        if compiled:
+            pattern = compiled['routes'].get((service, method, path))
+            if pattern is not None:
+                return pattern, self.data.options.get((service, method, pattern))
+        return self.get_pattern_data(self.data, service, path, method=method)
+
+    def get_response_body(self, service, method, pattern, options, prompt=None):
+        content_key = self.select_option(options, prompt=prompt)
+        status, _ = parse_option_key(content_key)
+        if not options[content_key]:
+            return status, b'{}'
+
+        compiled = self.pipeline.compiled if self.pipeline else None
+        body = compiled['bodies'].get((service, method, pattern, content_key)) if compiled else None
+        if body is None:
+            body = self.data.get_body(service, method, pattern, content_key)
+        if body is None:
+            body = json.dumps(options[content_key])
+        return status, body
 
     @contextmanager
     def patch_aiohttp(self):
@@ -156,17 +413,16 @@ class Stubs(StubsFileMixin):
                 'httpcore._sync.connection_pool.ConnectionPool.handle_request',
                 wraps=self.httpcore_handle_request
             ):
-                yield
+                with patch(
+                    'httpcore._async.connection_pool.AsyncConnectionPool.handle_async_request',
+                    wraps=self.httpcore_handle_async_request
+                ):
+                    yield
 
     @contextmanager
     def patch_requests(self):
-        # parallel gemini requests
-        self.requests_patcher = patch('requests.adapters.HTTPAdapter.send', wraps=self.send)
-        self.requests_patcher.start()
-        yield
-        self.requests_patcher.stop()
-        # with patch('requests.adapters.HTTPAdapter.send', wraps=self.send) as self.requests_patcher:
-        #   yield
+        with patch('requests.adapters.HTTPAdapter.send', wraps=self.send):
+            yield
 
     @contextmanager
     def up(
@@ -181,12 +437,7 @@ class Stubs(StubsFileMixin):
         self.extend_through_test_case = extend_through_test_case
 
         if self.pipeline:
-            for point in self.pipeline.points:
-                if point.name == 'external_api':
-                    point.pattern, _ = self.get_pattern_data(
-                        self.data, point.service, point.path, method=point.method
-                    )
-                    point.called = False
+            self.index_pipeline()
 
         if self.is_gentests:
             with self.patch_requests():
@@ -196,7 +447,17 @@ class Stubs(StubsFileMixin):
         else:
             with patch('requests.api.request', wraps=self.request) as mock_request:
                 with patch('requests.Session.request', wraps=self.request):
-                    yield mock_request
+                    with self.patch_aiohttp():
+                        yield mock_request
+
+    def index_pipeline(self):
+        for point in self.pipeline.points:
+            if point.name == 'external_api':
+                point.pattern, _ = self.get_request_pattern(
+                    point.service, point.path, point.method
+                )
+                point.called = False
+        self.pipeline.index_points()
 
     def find_point(self, points, service, method, path):
         result = None
@@ -266,8 +527,21 @@ class Stubs(StubsFileMixin):
             expected = {k: v for k, v in expected.items() if v is not None}
         return expected
 
+    def is_same_request(self, point, path, **kwargs):
+        if point.path != path:
+            return False
+        if self.normalize_query(point.params) != self.normalize_query(kwargs.get('params')):
+            return False
+        data = kwargs.get('data')
+        if isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except json.JSONDecodeError:
+                pass
+        return point.data is None or point.data == data
+
     def assertEqualData(self, point, **kwargs):
-        data = kwargs['data']
+        data = kwargs.get('data')
         expected = point.data
 
         if isinstance(data, str):
@@ -290,14 +564,19 @@ class Stubs(StubsFileMixin):
             'Unexpected request params. Point %s' % point.raw
         )
 
-    def httpcore_handle_request(self, request):
-        data = request.stream._stream.decode()
+    @staticmethod
+    def httpcore_request_options(request, body):
+        data = body.decode()
         if data:
             try:
                 data = json.loads(data)
             except json.JSONDecodeError:
                 data = parse_qs(data)
-        url = str(request.url.origin) + request.url.target.decode()
+        # `origin` always has a port, default ones are not in `external_services`
+        url = request.url.scheme + b'://' + request.url.host
+        if request.url.port is not None:
+            url += b':%d' % request.url.port
+        url = (url + request.url.target).decode()
         params = parse_qs(urlparse(url).query)
         method = request.method.decode()
         options = {
@@ -305,11 +584,37 @@ class Stubs(StubsFileMixin):
             'headers': {k.decode(): v.decode() for k, v in request.headers},
             'params': params or None,
         }
+        return method, url, options
+
+    def httpcore_handle_request(self, request):
+        from httpcore import Response as HTTPCoreResponse
+
+        method, url, options = self.httpcore_request_options(request, b''.join(request.stream))
         response = self.request(method, url, **options)
         return HTTPCoreResponse(response.status_code, headers={}, content=response.content)
 
-    def request_async(self, method, url, **kwargs):
-        return self.request(method, url, async_mode=True, **kwargs)
+    async def httpcore_handle_async_request(self, request):
+        from httpcore import Response as HTTPCoreResponse
+
+        body = b''.join([chunk async for chunk in request.stream])
+        method, url, options = self.httpcore_request_options(request, body)
+        # matched before the next await, see `request_async`
+        response = self.request(method, url, async_mode=True, **options)
+        return HTTPCoreResponse(
+            response.status, headers={},
+            content=MockStreamReader(response._content).iter_any()
+        )
+
+    async def request_async(self, method, url, **kwargs):
+        # aiohttp sends json payloads by `json` argument
+        if kwargs.get('json') is not None and kwargs.get('data') is None:
+            kwargs['data'] = kwargs.pop('json')
+        # points are matched before the first await, so concurrent
+        # requests consume the workflow in the order they are issued
+        response = self.request(method, str(url), async_mode=True, **kwargs)
+        response.method, response.url = method.upper(), url
+        await asyncio.sleep(0)
+        return response
 
     def request(self, method, url, async_mode=False, **kwargs):
         response_class = MockResponseAsync if async_mode else MockResponse
@@ -321,7 +626,7 @@ class Stubs(StubsFileMixin):
                 if point:
                     if point.data is not None:
                         self.test_case.assertEqual(
-                            kwargs['data'], point.data,
+                            kwargs.get('data'), point.data,
                             'Unxpected request data. Point %s' % point.raw
                         )
                     return response_class(
@@ -330,21 +635,32 @@ class Stubs(StubsFileMixin):
                     )
 
             if self.pipeline:
-                pattern, options = self.get_pattern_data(self.data, service, path, method=method)
-                if options:
-                    status, content, point = self.pipeline.get_reponse(service, method, pattern)
-                    if point:
-                        self.assertEqualData(point, **kwargs)
-                        self.assertEqualParams(point, **kwargs)
-                        self.test_case.assertDictContainsSubset(
-                            point.headers or {}, kwargs.get('headers', {}),
-                            'Unxpected request headers. Point %s' % point.raw
-                        )
-                    if status is None:
-                        status, content = self.select_response(options)
-
-                    return response_class(status, json.dumps(content or {}))
+                with self.lock:
+                    response = self.pipeline_request(response_class, service, method, path, **kwargs)
+                if response is not None:
+                    return response
 
         raise NotImplementedError(
             f'Unexpected api call.\nService ({service}), method ({method}), path ({path})\n'
         )
+
+    def pipeline_request(self, response_class, service, method, path, **kwargs):
+        pattern, options = self.get_request_pattern(service, path, method)
+        if options:
+            status, content, point = self.pipeline.get_reponse(
+                service, method, pattern,
+                match=lambda point: self.is_same_request(point, path, **kwargs)
+            )
+            if point:
+                self.assertEqualData(point, **kwargs)
+                self.assertEqualParams(point, **kwargs)
+                self.test_case.assertDictContainsSubset(
+                    point.headers or {}, kwargs.get('headers', {}),
+                    'Unxpected request headers. Point %s' % point.raw
+                )
+            if status is None:
+                status, body = self.get_response_body(service, method, pattern, options)
+                return response_class(status, body)
+
+            return response_class(status, json.dumps(content or {}))
+        return None
@@ -1,12 +1,37 @@
 import datetime
+import os
+import pickle
+import re
+from bisect import bisect_right
 from decimal import Decimal
+from functools import lru_cache
 
+import yaml
 from parse import Parser
 
+from . import settings
+
+try:
+    from yaml import (
+        CSafeDumper as YAMLDumper,
+        CSafeLoader as YAMLLoader,
+    )
+except ImportError:
+    from yaml import (  # type: ignore[assignment]
+        SafeDumper as YAMLDumper,
+        SafeLoader as YAMLLoader,
+    )
+
 __all__ = (
+    'RouteIndex',
+    'YAMLDumper',
+    'YAMLLoader',
+    'load_yaml_file',
     'select_path',
     'is_protected_type',
     'force_bytes',
+    'get_flows',
+    'load_flow',
 )
 
 
@@ -41,18 +66,110 @@ def search(path_pattern, full_url_pattern):
     return p.search(full_url_pattern)
 
 
+@lru_cache(maxsize=None)
+def compile_path(path_pattern):
+    extra_types = {parse_path_parameter.name: parse_path_parameter}
+    p = ExtendedParser(path_pattern, extra_types)
+    return re.compile('^' + p._expression + '$', p._re_flags)
+
+
+def path_depth(path_pattern):
+    # path parameters never match "/", so a pattern can only match paths
+    # with the same number of separators outside of `{...}` fields
+    return re.sub(r'\{[^}]*\}', '', path_pattern).count('/')
+
+
+class RouteIndex:
+    """
+    Compiled lookup table over path patterns.
+
+    Exact match wins, else the longest matching pattern
+    (first declared one for patterns of the same length).
+    """
+
+    def __init__(self, paths=()):
+        self.exact = set()
+        self.buckets = {}
+        for path_pattern in paths:
+            self.add(path_pattern)
+
+    def __contains__(self, path_pattern):
+        return path_pattern in self.exact
+
+    def __len__(self):
+        return len(self.exact)
+
+    def add(self, path_pattern):
+        if path_pattern in self.exact:
+            return
+        self.exact.add(path_pattern)
+
+        sizes, routes = self.buckets.setdefault(path_depth(path_pattern), ([], []))
+        position = bisect_right(sizes, -len(path_pattern))
+        sizes.insert(position, -len(path_pattern))
+        routes.insert(position, (path_pattern, compile_path(path_pattern)))
+
+    def select(self, path):
+        if path in self.exact:
+            return path
+
+        _, routes = self.buckets.get(path.count('/'), (None, ()))
+        for path_pattern, regex in routes:
+            if regex.search(path):
+                return path_pattern
+
+        return None
+
+
 def select_path(paths, path):
-    max_path_size = 0
-    result = None
-    for path_pattern in paths:
-        if path_pattern == path:
-            return path_pattern
+    if not isinstance(paths, RouteIndex):
+        paths = RouteIndex(paths)
+    return paths.select(path)
 
-        if search(path_pattern, path) and len(path_pattern) > max_path_size:
-            result = path_pattern
-            max_path_size = len(path_pattern)
 
-    return result
+def get_yaml_cache_path(path):
+    return os.path.join(os.path.dirname(path), '__pycache__', os.path.basename(path) + '.pickle')
+
+
+def load_yaml_file(path, cache=None):
+    """
+    Load yaml file with safe (libyaml when available) loader.
+
+    With cache enabled (`settings.YAML_CACHE`) loaded data is pickled to
+    `__pycache__` next to the file and reused while file mtime and size match.
+    """
+    if cache is None:
+        cache = settings.YAML_CACHE
+
+    if not cache:
+        with open(path) as yaml_file:
+            return yaml.load(yaml_file, Loader=YAMLLoader)
+
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cache_path = get_yaml_cache_path(path)
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            cached_key, data = pickle.load(cache_file)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        pass
+    else:
+        if cached_key == key:
+            return data
+
+    with open(path) as yaml_file:
+        data = yaml.load(yaml_file, Loader=YAMLLoader)
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = '%s.%s' % (cache_path, os.getpid())
+        with open(tmp_path, 'wb') as cache_file:
+            pickle.dump((key, data), cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+    return data
 
 
 def is_protected_type(obj):
@@ -82,3 +199,41 @@ def force_bytes(s, encoding='utf-8', strings_only=False, errors='strict'):
     if isinstance(s, memoryview):
         return bytes(s)
     return str(s).encode(encoding, errors)
+
+
+def get_flows(tree):
+    flows = []
+    if not tree:
+        return flows
+
+    for key in tree:
+        sub_flows = None
+        for point in tree[key]:
+            if '_point' not in point:
+                sub_flows = get_flows(point)
+                if sub_flows:
+                    for sub_flow in sub_flows:
+                        flows.append([key] + sub_flow)
+                else:
+                    flows.append([key])
+        if sub_flows is None:
+            flows.append([key])
+
+    return flows
+
+
+def load_flow(data, flow):
+    def collapse(data, dep=0):
+        result = []
+        for item in data:
+            if '_point' in item:
+                result.append(item.copy())
+            else:
+                key = flow[dep]
+                value = item[key]
+
+                result.extend(
+                    collapse(value, dep + 1)
+                )
+        return result
+    return collapse(data[flow[0]], dep=1)
@@ -5,9 +5,12 @@ Test workflows are flexible.
 It can be modified run time to imitate of mocked consumer.
 """
 
+import os
+import sys
 from contextlib import contextmanager
 
 from . import points
+from .replay import load_replay
 from .settings import EXTERNALS
 from .stub import Stubs
 
@@ -22,6 +25,9 @@ class WorkflowHandlerMixin:
     stubs_instance: Stubs = None  # type: ignore[assignment]
     contexts = ['context_default']
     initials: list = []
+    compiled_workflows = None
+    # matching of concurrent calls to the same route, see `points.Workflow`
+    stubs_ordering = points.Workflow.ORDERING_FIFO
 
     external_services = EXTERNALS
 
@@ -45,6 +51,18 @@ class WorkflowHandlerMixin:
                 data=cls.stubs_class.config(cls.stubs),
                 external_services=cls.external_services
             )
+            cls.compiled_workflows = cls.load_compiled_workflows()
+
+    @classmethod
+    def get_replay_path(cls):
+        return '%s.replay.json' % os.path.splitext(sys.modules[cls.__module__].__file__)[0]
+
+    @classmethod
+    def load_compiled_workflows(cls):
+        path = cls.get_replay_path()
+        if not os.path.exists(path):
+            return None
+        return load_replay(path, sys.modules[cls.__module__].__file__, cls.stubs)
 
     def setUp(self):
         super().setUp()  # type: ignore[misc]
@@ -97,9 +115,14 @@ class WorkflowHandlerMixin:
             if item.role == points.Role.CONTEXT:
                 context = item.path
 
+        compiled = None
+        if self.compiled_workflows:
+            compiled = self.compiled_workflows.get(self._testMethodName)  # type: ignore[attr-defined]
+
         workflow = points.Workflow(
             workflow, context=context, stubs_data=self.stubs_instance.data,
-            e2e=self.is_e2e_mode()  # type: ignore[attr-defined]
+            e2e=self.is_e2e_mode(),  # type: ignore[attr-defined]
+            compiled=compiled, ordering=self.stubs_ordering
         )
 
         self.run_test(workflow)
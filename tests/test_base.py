@@ -0,0 +1,24 @@
+import subprocess
+import sys
+import unittest
+
+
+class BaseExportsTestCase(unittest.TestCase):
+    def run_code(self, code):
+        return subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    def test_import_star(self):
+        namespace = {}
+        exec('from apitests.base import *', namespace)
+        self.assertEqual(namespace['GenTestCase'].__name__, 'GenTestCase')
+        self.assertIn('WorkflowTestCase', namespace)
+
+    def test_lazy_generator(self):
+        self.assertEqual(self.run_code(
+            'import sys, apitests.base; print("apitests.generator" in sys.modules)'
+        ), 'False')
+        self.assertEqual(self.run_code(
+            'import sys; from apitests.base import GenTestCase; print("apitests.generator" in sys.modules)'
+        ), 'True')
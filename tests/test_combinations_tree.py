@@ -0,0 +1,77 @@
+import itertools
+import random
+import unittest
+
+from apitests.generator.stubgen import CombinationsTree
+
+
+def is_covered(combination, passed):
+    for item in passed:
+        if all(value is None or value == combination[index] for index, value in enumerate(item)):
+            return True
+    return False
+
+
+def walk(tree, sizes):
+    combinations = []
+    combination = tree.next_combination(sizes)
+    while combination is not None:
+        combinations.append(combination)
+        combination = tree.next_combination(sizes, after=combination)
+    return combinations
+
+
+class CombinationsTreeTestCase(unittest.TestCase):
+    def test_product(self):
+        sizes = [2, 3, 1, 2]
+        self.assertEqual(walk(CombinationsTree(), sizes), list(itertools.product(*map(range, sizes))))
+
+    def test_wildcards(self):
+        tree = CombinationsTree()
+        tree.add((None, 1))
+        self.assertEqual(walk(tree, [2, 3]), [(0, 0), (0, 2), (1, 0), (1, 2)])
+
+    def test_trailing_wildcards_trimmed(self):
+        tree = CombinationsTree()
+        tree.add((1, None, None))
+        node = tree.root.children[1]
+        self.assertTrue(node.complete)
+        self.assertEqual(node.children, {})
+        self.assertEqual(walk(tree, [3, 2, 2]), [
+            combination for combination in itertools.product(range(3), range(2), range(2))
+            if combination[0] != 1
+        ])
+
+    def test_all_wildcards(self):
+        tree = CombinationsTree()
+        tree.add((None, None))
+        self.assertIsNone(tree.next_combination([2, 2]))
+
+    def test_resume_after(self):
+        tree = CombinationsTree()
+        tree.add((1, 0))
+        self.assertEqual(tree.next_combination([3, 2], after=(0, 1)), (1, 1))
+        self.assertEqual(tree.next_combination([3, 2], after=(1, 1)), (2, 0))
+        self.assertIsNone(tree.next_combination([3, 2], after=(2, 1)))
+
+    def test_product_filtered(self):
+        rnd = random.Random(0)
+        for _ in range(200):
+            sizes = [rnd.randint(1, 3) for _ in range(rnd.randint(1, 4))]
+            passed = [
+                tuple(rnd.choice([None] + list(range(size))) for size in sizes)
+                for _ in range(rnd.randint(0, 4))
+            ]
+            tree = CombinationsTree()
+            for combination in passed:
+                tree.add(combination)
+
+            expected = [
+                combination for combination in itertools.product(*map(range, sizes))
+                if not is_covered(combination, passed)
+            ]
+            self.assertEqual(walk(tree, sizes), expected, (sizes, passed))
+
+            after = tuple(rnd.randrange(size) for size in sizes)
+            following = [combination for combination in expected if combination > after]
+            self.assertEqual(tree.next_combination(sizes, after=after), following[0] if following else None)
@@ -0,0 +1,174 @@
+import inspect
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+
+from apitests import points
+from apitests.base import GenTestCase
+from apitests.generator.fingerprints import (
+    combination_key_from_json,
+    combination_key_to_json,
+    load_fingerprints,
+    stubs_fingerprints,
+)
+from apitests.generator.parallel import generate_parallel
+from apitests.helpers import yaml_dumps
+from apitests.utils import load_yaml_file
+
+STUBS_PATH = os.path.join(os.path.dirname(__file__), 'apistubs.yaml')
+
+
+class IncrementalGenTestCase(GenTestCase):
+    feature = 'incremental'
+    stubs = STUBS_PATH
+    external_services = {
+        'first.local': 'first',
+        'second.local': 'second',
+    }
+    initials = [points.Process('handle')]
+    skip_gen_doublerun = True
+    regenerate_incremental = True
+    # snapshots and fingerprints are written to a temporary directory
+    base_path = None
+
+    @classmethod
+    def get_base_path(cls):
+        return cls.base_path
+
+    def handle(self, workflow):
+        # `second` is called after successful `first` only
+        if requests.get('https://first.local/').ok:
+            requests.get('https://second.local/')
+
+
+class FingerprintsTestCase(unittest.TestCase):
+    def test_stubs_fingerprints(self):
+        data = load_yaml_file(STUBS_PATH)
+        data.pop('apistubs')
+        previous = stubs_fingerprints(data)
+
+        data['second']['get#/']['500-error'] = {'error': 'changed'}
+        current = stubs_fingerprints(data)
+
+        self.assertEqual(current['first'], previous['first'])
+        self.assertNotEqual(current['second']['get#/'], previous['second']['get#/'])
+
+    def test_combination_key(self):
+        key = (0, 1, (('first', 'get#/'), 2), (('second', 'get#/'), 0))
+        self.assertEqual(combination_key_from_json(combination_key_to_json(key)), key)
+
+    def test_load_invalid(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'test.fingerprints.json')
+            self.assertIsNone(load_fingerprints(path))
+            with open(path, 'w') as cache_file:
+                cache_file.write('{"fingerprint"')
+            self.assertIsNone(load_fingerprints(path))
+
+
+class ReusePipelinesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+        stubs_path = os.path.join(self.tmp, 'apistubs.yaml')
+        shutil.copy(STUBS_PATH, stubs_path)
+        patcher = mock.patch.multiple(
+            IncrementalGenTestCase, base_path=self.tmp, stubs=stubs_path,
+            initials=list(IncrementalGenTestCase.initials)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.test_case = IncrementalGenTestCase
+        self.key = IncrementalGenTestCase.get_pipelines_key(0)
+        self.addCleanup(self.clean_pipelines)
+
+    def clean_pipelines(self):
+        for index in (0, 1):
+            key = self.test_case.get_pipelines_key(index)
+            self.test_case.pipelines.pop(key, None)
+            self.test_case.pipelines_combinations.pop(key, None)
+
+    def generate(self, workers=2):
+        test_case = self.test_case
+        test_case.generator_workers = workers
+        try:
+            with mock.patch('sys.stdout'):
+                test_case.generator_set_up_class()
+        finally:
+            test_case.generator_workers = 1
+        self.assertFalse(test_case.generator_errors)
+
+    def save(self):
+        with mock.patch('sys.stdout'):
+            self.test_case.save_tests()
+
+    def reuse(self):
+        # set up without workers only restores pipelines from the cache
+        self.generate(workers=1)
+        return self.test_case.pipelines_combinations.get(self.key, [])
+
+    def change_stubs(self, service, option, content):
+        data = load_yaml_file(self.test_case.stubs)
+        data[service]['get#/'][option] = content
+        with open(self.test_case.stubs, 'w') as stubs_file:
+            stubs_file.write(yaml_dumps(data))
+
+    def test_reuse_unchanged(self):
+        self.generate()
+        generated = list(self.test_case.pipelines_combinations[self.key])
+        self.assertEqual(len(generated), 5)
+        self.save()
+
+        self.assertEqual(sorted(self.reuse()), sorted(generated))
+        # regeneration adds nothing to reused pipelines
+        self.test_case.generator_workers = 2
+        try:
+            with mock.patch('sys.stdout'):
+                self.assertFalse(generate_parallel(self.test_case, 2))
+        finally:
+            self.test_case.generator_workers = 1
+        self.assertEqual(len(self.test_case.pipelines[self.key]), len(generated))
+
+    def test_changed_stubs(self):
+        self.generate()
+        self.save()
+
+        self.change_stubs('second', '500-error', {'error': 'changed'})
+        reused = self.reuse()
+
+        # only pipelines not calling `second` are reused
+        self.assertEqual(len(reused), 2)
+        for key in reused:
+            self.assertEqual([route for route, _ in key[2:]], [('first', 'get#/')])
+
+    def test_changed_code(self):
+        self.generate()
+        self.save()
+
+        source = os.path.join(self.tmp, 'source.py')
+        with open(inspect.getsourcefile(IncrementalGenTestCase)) as source_file:
+            code = source_file.read()
+        with open(source, 'w') as source_file:
+            source_file.write(code + '\n# changed\n')
+
+        getsourcefile = inspect.getsourcefile
+
+        def changed_sourcefile(obj):
+            path = getsourcefile(obj)
+            return source if path == __file__ else path
+
+        with mock.patch('inspect.getsourcefile', changed_sourcefile):
+            self.assertEqual(self.reuse(), [])
+
+    def test_changed_initials(self):
+        self.generate()
+        self.save()
+
+        self.test_case.initials = [points.Process('handle_changed')]
+        self.assertEqual(self.reuse(), [])
@@ -0,0 +1,142 @@
+import copy
+import json
+import random
+import unittest
+
+from apitests.generator.transformer import (
+    fold_pipeline,
+    unfold_pipeline,
+)
+
+
+class HashedPoint(str):
+    def __new__(cls, point):
+        value = point.copy()
+        value.pop('_meta', None)
+        obj = str.__new__(cls, json.dumps(value))
+        obj.payload = point
+        return obj
+
+
+def baseline_fold_pipeline(data):
+    # previous implementation: trie over tuples of hashed points
+    tree = {}
+    for item in data.values():
+        cursor = tree
+        for point in item:
+            cursor = cursor.setdefault((HashedPoint(point), ), {})
+
+    def reduce_tree(tree):
+        for key in list(tree.keys()):
+            reduce_tree(tree[key])
+            sub_keys = list(tree[key].keys())
+            if len(sub_keys) == 1:
+                sub_key = sub_keys[0]
+                tree[key + sub_key] = tree[key][sub_key]
+                tree.pop(key)
+
+    def transform_tree(tree, index=()):
+        data = {}
+        for i, key in enumerate(tree.keys(), start=1):
+            item_index = index + (i,)
+            item = []
+            for point in key:
+                point.payload.setdefault('_meta', {})
+                point.payload['_meta']['branch'] = '.'.join([str(i) for i in item_index])
+                item.append(point.payload)
+
+            children = transform_tree(tree[key], item_index)
+            if children:
+                item.append(children)
+
+            data['WORKFLOW-w%s' % '.'.join([str(i) for i in item_index])] = item
+        return data
+
+    reduce_tree(tree)
+    return transform_tree(tree)
+
+
+def context(name):
+    return {'_point': 'ContextSetUp', 'context': name}
+
+
+def call(service, status=200, **kwargs):
+    return dict({'_point': 'PointExternalApi', 'service': service, 'method': 'get', 'status': status}, **kwargs)
+
+
+def alias(name):
+    return {'_point': 'PointStubAlias', 'alias': name}
+
+
+class FoldPipelineTestCase(unittest.TestCase):
+    def assertFoldEqual(self, data):
+        expected = baseline_fold_pipeline(copy.deepcopy(data))
+        folded = fold_pipeline(copy.deepcopy(data))
+        self.assertEqual(json.dumps(folded), json.dumps(expected))
+        return folded
+
+    def test_empty(self):
+        self.assertEqual(self.assertFoldEqual({}), {})
+        self.assertFoldEqual({'TEST.000': []})
+
+    def test_single(self):
+        folded = self.assertFoldEqual({'TEST.000': [context('default'), call('github'), alias('ok')]})
+        self.assertEqual(list(folded), ['WORKFLOW-w1'])
+        self.assertEqual(len(folded['WORKFLOW-w1']), 3)
+
+    def test_repeated_points(self):
+        self.assertFoldEqual({
+            'TEST.000': [context('default'), call('github'), call('github'), alias('ok')],
+            'TEST.001': [context('default'), call('github'), call('github'), call('github')],
+        })
+
+    def test_identical_pipelines(self):
+        pipeline = [context('default'), call('github'), alias('ok')]
+        folded = self.assertFoldEqual({'TEST.000': pipeline, 'TEST.001': copy.deepcopy(pipeline)})
+        self.assertEqual(list(folded), ['WORKFLOW-w1'])
+
+    def test_meta_ignored(self):
+        first = [dict(call('github'), _meta={'test': 'TEST.000'}), alias('ok')]
+        second = [dict(call('github'), _meta={'test': 'TEST.001'}), alias('not_found')]
+        folded = self.assertFoldEqual({'TEST.000': first, 'TEST.001': second})
+        self.assertEqual(folded['WORKFLOW-w1'][0]['_meta']['test'], 'TEST.000')
+
+    def test_contexts(self):
+        folded = self.assertFoldEqual({
+            'TEST.000': [context('default'), call('github'), alias('ok')],
+            'TEST.001': [context('admin'), call('github'), alias('ok')],
+            'TEST.002': [context('default'), call('github', status=404), alias('not_found')],
+            'TEST.003': [context('default'), call('github'), alias('error')],
+        })
+        self.assertEqual(list(folded), ['WORKFLOW-w1', 'WORKFLOW-w2'])
+
+    def test_branching_order(self):
+        # merged chains follow branching nodes
+        self.assertFoldEqual({
+            'TEST.000': [context('a'), call('x')],
+            'TEST.001': [context('b'), call('x'), alias('ok')],
+            'TEST.002': [context('b'), call('x'), alias('error')],
+            'TEST.003': [context('c')],
+            'TEST.004': [context('d'), call('y'), alias('ok')],
+            'TEST.005': [context('d'), call('z')],
+        })
+
+    def test_random(self):
+        rnd = random.Random(0)
+        points = [context('a'), context('b'), call('x'), call('y'), call('x', status=500), alias('ok')]
+        for _ in range(300):
+            data = {
+                'TEST.%03d' % index: [
+                    copy.deepcopy(rnd.choice(points)) for _ in range(rnd.randint(0, 5))
+                ]
+                for index in range(rnd.randint(0, 8))
+            }
+            self.assertFoldEqual(data)
+
+    def test_unfold(self):
+        data = {
+            'TEST.000': [context('default'), call('github'), alias('ok')],
+            'TEST.001': [context('default'), call('github'), alias('error')],
+        }
+        flows = unfold_pipeline(fold_pipeline(copy.deepcopy(data)))
+        self.assertEqual(len(flows), 2)
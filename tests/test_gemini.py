@@ -0,0 +1,118 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import unittest
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from unittest import mock
+
+from apitests.contrib import gemini
+from apitests.contrib.llmcache import PayloadCache
+from apitests.generator.stubgen import StubsGen
+
+REQUEST_RE = re.compile(r'\[(\w+)\] (\S+)')
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = body['contents'][0]['parts'][0]['text']
+        self.server.prompts.append(prompt)
+
+        requests = REQUEST_RE.findall(prompt)
+        if prompt.startswith('Give example payloads'):
+            payload = {
+                f'[{method}] {url}': {'url': url}
+                for method, url in requests if url not in self.server.skipped
+            }
+        else:
+            payload = {'url': requests[0][1]} if requests else {}
+        text = '```json\n%s\n```' % json.dumps(payload)
+
+        content = json.dumps({'candidates': [{'content': {'parts': [{'text': text}]}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class GeminiClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        self.server.prompts = []
+        self.server.skipped = set()
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.base_url = 'http://127.0.0.1:%s' % self.server.server_address[1]
+        self.client = gemini.GeminiClient(base_url=self.base_url, batch_size=2, concurrency=2)
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = PayloadCache(os.path.join(self.tmp.name, 'llm'))
+        self.patchers = [
+            mock.patch.dict(gemini._clients, {None: self.client}, clear=True),
+            mock.patch.object(gemini, 'get_payload_cache', return_value=self.cache),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in reversed(self.patchers):
+            patcher.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def test_generate_payload(self):
+        self.assertEqual(
+            self.client.generate_payload('get', 'https://svc.local/items'),
+            {'url': 'https://svc.local/items'}
+        )
+
+    def test_generate_payloads(self):
+        endpoints = [('GET', 'https://svc.local/items/%s' % index) for index in range(5)]
+        payloads = self.client.generate_payloads(endpoints + endpoints[:1])
+
+        self.assertEqual(payloads, {endpoint: {'url': endpoint[1]} for endpoint in endpoints})
+        # batches of 2, 2 and 1 endpoints
+        self.assertEqual(len(self.server.prompts), 3)
+
+    def test_skipped_in_batch(self):
+        self.server.skipped.add('https://svc.local/b')
+        payloads = self.client.generate_payloads([('GET', 'https://svc.local/a'), ('GET', 'https://svc.local/b')])
+
+        self.assertEqual(payloads[('GET', 'https://svc.local/b')], {'url': 'https://svc.local/b'})
+        self.assertEqual(len(self.server.prompts), 2)
+
+    def test_get_payloads_cached(self):
+        endpoints = [('GET', 'https://svc.local/items'), ('POST', 'https://svc.local/items')]
+        first = gemini.get_payloads(endpoints)
+        prompts = len(self.server.prompts)
+
+        self.assertEqual(gemini.get_payloads(endpoints), first)
+        self.assertEqual(gemini.get_payload('GET', 'https://svc.local/items'), first[endpoints[0]])
+        self.assertEqual(len(self.server.prompts), prompts)
+
+    def test_pooled_client(self):
+        with mock.patch.object(gemini.settings, 'LLM_URL', self.base_url):
+            gemini.generate_gemini_content('key', 'prompt')
+            client = gemini._clients['key']
+            gemini.generate_gemini_content('key', 'prompt')
+        self.assertIs(gemini._clients['key'], client)
+
+    def test_prefetch(self):
+        stubs = StubsGen(data={'svc': {}}, initial_points=[None], contexts=[None], external_services={'svc.local': 'svc'})
+        stubs.prefetch_payloads([('GET', 'https://svc.local/items/7')])
+        prompts = len(self.server.prompts)
+
+        stubs.stub_combination = (0, 0)
+        response = stubs.generate_response('get', 'http://svc.local/items/8')
+
+        self.assertEqual(response.json(), {'url': 'https://svc.local/items/7'})
+        self.assertEqual(len(self.server.prompts), prompts)
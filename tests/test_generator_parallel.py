@@ -0,0 +1,69 @@
+import os
+import unittest
+from unittest import mock
+
+import requests
+
+from apitests import points
+from apitests.base import GenTestCase
+from apitests.generator.stubgen import StubsGenMixin
+from apitests.generator.transformer import normilize_pipeline
+
+STUBS_PATH = os.path.join(os.path.dirname(__file__), 'apistubs.yaml')
+
+
+class LimitedGenTestCase(GenTestCase):
+    feature = 'parallel'
+    stubs = STUBS_PATH
+    external_services = {
+        'first.local': 'first',
+        'second.local': 'second',
+    }
+    initials = [points.Process('handle')]
+    skip_gen_doublerun = True
+    max_tests = 2
+
+    def handle(self, workflow):
+        requests.get('https://first.local/')
+        requests.get('https://second.local/')
+
+
+class LimitedDoublerunGenTestCase(LimitedGenTestCase):
+    skip_gen_doublerun = False
+    max_tests = 3
+
+
+class GenerateParallelTestCase(unittest.TestCase):
+    def generate(self, test_case, workers=2):
+        test_case.generator_workers = workers
+        try:
+            test_case.generator_set_up_class()
+        finally:
+            test_case.generator_workers = 1
+
+        self.assertFalse(test_case.generator_errors)
+        return (
+            test_case.pipelines.pop(test_case.get_pipelines_key(0)),
+            test_case.pipelines.pop(test_case.get_pipelines_key(1), []),
+            test_case.pipelines_combinations.pop(test_case.get_pipelines_key(0)),
+        )
+
+    def test_max_tests(self):
+        data, data_repeated, combinations = self.generate(LimitedGenTestCase)
+
+        self.assertEqual(len(data), LimitedGenTestCase.max_tests)
+        self.assertEqual(len(set(combinations)), LimitedGenTestCase.max_tests)
+        self.assertEqual(data_repeated, [])
+
+    @mock.patch.object(StubsGenMixin, 'doublerun_delay', 0)
+    def test_max_tests_doublerun(self):
+        data, data_repeated, combinations = self.generate(LimitedDoublerunGenTestCase)
+
+        self.assertEqual(len(data), LimitedDoublerunGenTestCase.max_tests)
+        self.assertEqual([name for name, _ in data_repeated], [name for name, _ in data])
+        for (_, pipeline), (_, repeated) in zip(data, data_repeated):
+            self.assertEqual(
+                [point.get('_service') for point in pipeline],
+                [point.get('_service') for point in repeated],
+            )
+        normilize_pipeline(dict(data), data_repeated=dict(data_repeated), use_set_pattern=False)
@@ -0,0 +1,132 @@
+import os
+import tempfile
+import time
+import unittest
+
+from apitests.contrib.llmcache import PayloadCache, normalize_path
+
+
+class NormalizePathTestCase(unittest.TestCase):
+    def test_params(self):
+        self.assertEqual(normalize_path('https://ipinfo.io/8.8.8.8/geo'), 'ipinfo.io/{param}/geo')
+        self.assertEqual(normalize_path('https://api.local/users/42'), 'api.local/users/{param}')
+        self.assertEqual(
+            normalize_path('https://api.local/items/123e4567-e89b-12d3-a456-426614174000'),
+            'api.local/items/{param}'
+        )
+        self.assertEqual(normalize_path('https://api.local/users/me'), 'api.local/users/me')
+
+    def test_same_key(self):
+        self.assertEqual(
+            PayloadCache.make_key('get', 'https://api.local/users/1', 'tpl', 'model'),
+            PayloadCache.make_key('GET', 'https://api.local/users/2', 'tpl', 'model'),
+        )
+        self.assertNotEqual(
+            PayloadCache.make_key('get', 'https://api.local/users/1', 'tpl', 'model'),
+            PayloadCache.make_key('get', 'https://api.local/users/1', 'tpl', 'other'),
+        )
+
+
+class PayloadCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def get_cache(self, **kwargs):
+        return PayloadCache(self.tmp.name, **kwargs)
+
+    def write(self, cache, key, content):
+        path = cache.get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as cache_file:
+            cache_file.write(content)
+        return path
+
+    def set_times(self, path, atime, mtime):
+        os.utime(path, (atime, mtime))
+
+    def test_get_set(self):
+        cache = self.get_cache()
+        self.assertIsNone(cache.get('ab01'))
+        cache.set('ab01', {'id': 1}, url='https://api.local/')
+        self.assertEqual(cache.get('ab01'), {'id': 1})
+
+    def test_ttl(self):
+        cache = self.get_cache(ttl=60)
+        cache.set('ab01', {'id': 1})
+        path = cache.get_path('ab01')
+        self.assertEqual(cache.get('ab01'), {'id': 1})
+
+        expired = time.time() - 120
+        self.set_times(path, expired, expired)
+        self.assertIsNone(cache.get('ab01'))
+        self.assertFalse(os.path.exists(path))
+
+    def test_corrupted(self):
+        cache = self.get_cache()
+        for key, content in (
+            ('aa01', '{"payl'),
+            ('aa02', '{"meta": {}}'),
+            ('aa03', '[1, 2]'),
+            ('aa04', '"payload"'),
+        ):
+            with self.subTest(content=content):
+                self.write(cache, key, content)
+                self.assertIsNone(cache.get(key))
+
+    def test_get_or_generate(self):
+        cache = self.get_cache()
+        calls = []
+
+        def generate(method, url):
+            calls.append((method, url))
+            return {'url': url}
+
+        self.write(cache, cache.make_key('get', 'https://api.local/users/1', 'tpl', 'm'), '{}')
+        payload = cache.get_or_generate('get', 'https://api.local/users/1', generate, 'tpl', 'm')
+        self.assertEqual(payload, {'url': 'https://api.local/users/1'})
+        # corrupted entry is replaced, similar urls hit the cache
+        payload = cache.get_or_generate('get', 'https://api.local/users/2', generate, 'tpl', 'm')
+        self.assertEqual(payload, {'url': 'https://api.local/users/1'})
+        self.assertEqual(calls, [('get', 'https://api.local/users/1')])
+
+    def test_evict_size(self):
+        cache = self.get_cache()
+        now = time.time()
+        for index, key in enumerate(('aa01', 'aa02', 'aa03')):
+            cache.set(key, {'data': 'x' * 100})
+            # aa01 is the least recently used
+            self.set_times(cache.get_path(key), now - 300 + index * 100, now)
+
+        size = os.path.getsize(cache.get_path('aa01'))
+        cache.max_size = size * 2
+        cache.evict()
+
+        self.assertFalse(os.path.exists(cache.get_path('aa01')))
+        self.assertTrue(os.path.exists(cache.get_path('aa02')))
+        self.assertTrue(os.path.exists(cache.get_path('aa03')))
+
+    def test_hit_is_recently_used(self):
+        cache = self.get_cache()
+        now = time.time()
+        for index, key in enumerate(('aa01', 'aa02')):
+            cache.set(key, {'data': 'x' * 100})
+            self.set_times(cache.get_path(key), now - 300 + index * 100, now)
+
+        cache.get('aa01')
+        cache.max_size = os.path.getsize(cache.get_path('aa01'))
+        cache.evict()
+
+        self.assertTrue(os.path.exists(cache.get_path('aa01')))
+        self.assertFalse(os.path.exists(cache.get_path('aa02')))
+
+    def test_evict_ttl(self):
+        cache = self.get_cache(ttl=60, max_size=10 ** 6)
+        cache.set('aa01', {'id': 1})
+        expired = time.time() - 120
+        self.set_times(cache.get_path('aa01'), expired, expired)
+
+        cache.set('aa02', {'id': 2})
+
+        self.assertFalse(os.path.exists(cache.get_path('aa01')))
+        self.assertEqual(cache.get('aa02'), {'id': 2})
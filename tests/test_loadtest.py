@@ -0,0 +1,136 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+
+import requests
+import yaml
+
+from apitests.loadtest import (
+    LatencyHistogram,
+    LoadTest,
+    load_branches,
+    start_stub_server,
+)
+from apitests.points import PointApi
+
+STUBS_PATH = os.path.join(os.path.dirname(__file__), 'apistubs.yaml')
+
+APIFLOWS = {
+    'WORKFLOW-w1': [
+        {'_point': 'api', 'method': 'get', 'path': '/items', 'status': 200},
+        {
+            'WORKFLOW-w1.1': [
+                {'_point': 'external_api', '_service': 'first', 'method': 'get', 'path': '/', 'status': 200, 'prompt': 'ok'},
+            ],
+            'WORKFLOW-w1.2': [
+                {'_point': 'external_api', '_service': 'first', 'method': 'get', 'path': '/', 'status': 404, 'prompt': 'not_found'},
+            ],
+        },
+    ],
+}
+
+
+class AppHandler(BaseHTTPRequestHandler):
+    # calls the stubbed service and replies with its status
+    def do_GET(self):
+        response = requests.get(self.server.stubs_url + '/first/')
+        self.send_response(response.status_code)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class LatencyHistogramTestCase(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 101):
+            histogram.add(value / 1000)
+
+        summary = histogram.summary()
+        self.assertEqual(summary['count'], 100)
+        self.assertAlmostEqual(summary['p50'], 0.05, delta=0.05 * 0.05)
+        self.assertAlmostEqual(summary['p90'], 0.09, delta=0.09 * 0.05)
+        self.assertAlmostEqual(summary['p99'], 0.099, delta=0.099 * 0.05)
+        self.assertEqual(summary['max'], 0.1)
+        self.assertEqual(LatencyHistogram().percentile(50), 0.0)
+
+    def test_merge(self):
+        histogram, first, second = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for value in range(1, 101):
+            histogram.add(value / 1000, error=value % 10 == 0, failure=value % 25 == 0)
+            (first if value % 2 else second).add(value / 1000, error=value % 10 == 0, failure=value % 25 == 0)
+
+        first.merge(second)
+        self.assertEqual(first.counts, histogram.counts)
+        self.assertEqual(first.summary()['errors'], 10)
+        self.assertEqual(first.summary()['failures'], 4)
+        for key, value in histogram.summary().items():
+            self.assertAlmostEqual(first.summary()[key], value)
+
+
+class LoadTestTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.stub_server = start_stub_server(STUBS_PATH, 0)
+        cls.app = ThreadingHTTPServer(('127.0.0.1', 0), AppHandler)
+        cls.app.stubs_url = 'http://127.0.0.1:%s' % cls.stub_server.port
+        threading.Thread(target=cls.app.serve_forever, args=(0.05,), daemon=True).start()
+        cls.target = 'http://127.0.0.1:%s' % cls.app.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.app.shutdown()
+        cls.app.server_close()
+
+    def test_load_branches(self):
+        with tempfile.TemporaryDirectory() as path:
+            path = os.path.join(path, 'test.apiflows.yaml')
+            with open(path, 'w') as flows_file:
+                flows_file.write(yaml.safe_dump(APIFLOWS))
+            branches = load_branches(path)
+
+        self.assertEqual([(branch, aliases) for branch, _, aliases in branches], [
+            ('WORKFLOW-w1.1', ['ok']),
+            ('WORKFLOW-w1.2', ['not_found']),
+        ])
+        self.assertEqual(branches[0][1][0].path, '/items')
+
+    def test_aliases(self):
+        branches = [
+            ('ok', [PointApi('get', '/items', headers={'X-Count': 5}, response_status=200)], ['ok']),
+            ('not_found', [PointApi('get', '/items', response_status=404)], ['not_found']),
+        ]
+        report = LoadTest(
+            branches, self.target, concurrency=2, duration=0.4, stub_server=self.stub_server
+        ).run()
+
+        self.assertEqual(sorted(report), ['not_found', 'ok'])
+        for histogram in report.values():
+            self.assertTrue(histogram.count)
+            self.assertEqual((histogram.errors, histogram.failures), (0, 0))
+        self.assertEqual(self.stub_server.aliases, [])
+
+    def test_errors(self):
+        # default stub option is `ok`
+        branches = [('not_found', [PointApi('get', '/items', response_status=404)], ['not_found'])]
+        report = LoadTest(branches, self.target, concurrency=2, duration=0.2).run()
+        self.assertEqual(report['not_found'].errors, report['not_found'].count)
+
+    def test_failures(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+
+        branches = [('ok', [PointApi('get', '/items', response_status=200)], [])]
+        report = LoadTest(branches, 'http://127.0.0.1:%s' % port, concurrency=2, duration=0.2).run()
+        self.assertTrue(report['ok'].count)
+        self.assertEqual(report['ok'].failures, report['ok'].count)
+        self.assertEqual(report['ok'].errors, 0)
@@ -0,0 +1,119 @@
+import logging
+import unittest
+
+from apitests import points
+from apitests.contrib.logs import (
+    LogCapture,
+    LogMatcher,
+    LogsTestCaseMixin,
+)
+
+LOGGER_NAME = 'apitests.tests.logs'
+
+
+class LogMatcherTestCase(LogsTestCaseMixin, unittest.TestCase):
+    generator_mode = False
+
+    def setUp(self):
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.level = self.logger.level
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        self.logger.setLevel(self.level)
+
+    def replay(self, *log_points):
+        workflow = points.Workflow(list(log_points))
+        with self.capture_logs(workflow):
+            self.logger.info('user %s created', 42)
+            self.logger.warning('done')
+
+    def test_message(self):
+        self.replay(
+            points.PointLog('INFO:%s' % LOGGER_NAME, 'user 42 created'),
+            points.PointLog('WARNING:%s' % LOGGER_NAME, 'done'),
+        )
+
+    def test_pattern(self):
+        self.replay(points.PointLog('INFO:%s' % LOGGER_NAME, pattern='user %s created'))
+
+    def test_pattern_as_message(self):
+        # generated tests before `pattern=` was rendered
+        self.replay(points.PointLog('INFO:%s' % LOGGER_NAME, 'user %s created'))
+
+    def test_unmatched(self):
+        with self.assertRaises(AssertionError):
+            self.replay(points.PointLog('INFO:%s' % LOGGER_NAME, 'user 7 created'))
+
+        with self.assertRaises(AssertionError):
+            self.replay(points.PointLog('ERROR:%s' % LOGGER_NAME, 'done'))
+
+    def test_disabled_level(self):
+        # the logger doesn't emit debug records, they are not expected
+        self.replay(points.PointLog('DEBUG:%s' % LOGGER_NAME, 'user 42 loaded'))
+
+        matcher = LogMatcher([points.PointLog('DEBUG:%s' % LOGGER_NAME, 'user 42 loaded')])
+        self.assertFalse(matcher.unmatched)
+
+        self.logger.setLevel(logging.DEBUG)
+        with self.assertRaises(AssertionError):
+            self.replay(points.PointLog('DEBUG:%s' % LOGGER_NAME, 'user 42 loaded'))
+
+
+class LogCaptureTestCase(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.other = logging.getLogger('apitests.tests.other')
+        self.level = self.logger.level
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        self.logger.setLevel(self.level)
+        self.logger.disabled = False
+
+    def messages(self, capture):
+        return [point.path for point in capture.points]
+
+    def test_levels(self):
+        with LogCapture(level=logging.WARNING).patch() as capture:
+            self.logger.debug('debug')
+            self.logger.info('info')
+            self.logger.warning('warning')
+        self.assertEqual(self.messages(capture), ['warning'])
+
+        with LogCapture().patch() as capture:
+            self.logger.debug('debug')
+            self.logger.info('info')
+        self.assertEqual(self.messages(capture), ['info'])
+
+    def test_prefix(self):
+        with LogCapture(accept=lambda name: name.startswith(LOGGER_NAME)).patch() as capture:
+            self.logger.warning('accepted')
+            self.other.warning('skipped')
+        self.assertEqual(self.messages(capture), ['accepted'])
+
+    def test_disabled_and_filtered(self):
+        log_filter = logging.Filter('apitests.tests.nothing')
+        self.other.addFilter(log_filter)
+        self.logger.disabled = True
+        try:
+            with LogCapture().patch() as capture:
+                self.logger.warning('disabled')
+                self.other.warning('filtered')
+        finally:
+            self.other.removeFilter(log_filter)
+        self.assertEqual(self.messages(capture), [])
+
+    def test_limit(self):
+        with LogCapture(limit=3).patch() as capture:
+            for index in range(5):
+                self.logger.warning('message %s', index)
+        self.assertEqual(self.messages(capture), ['message 2', 'message 3', 'message 4'])
+
+    def test_restore(self):
+        handle = logging.Logger.handle
+        with self.assertRaises(ValueError):
+            with LogCapture().patch():
+                self.assertIsNot(logging.Logger.handle, handle)
+                raise ValueError
+        self.assertIs(logging.Logger.handle, handle)
@@ -0,0 +1,30 @@
+import asyncio
+import json
+import unittest
+
+from apitests.stub import (
+    MockResponse,
+    MockResponseAsync,
+)
+
+CONTENT = {'items': [1, 2], 'name': 'kate'}
+
+
+class MockResponseTestCase(unittest.TestCase):
+    def test_json_mutation(self):
+        response = MockResponse(200, json.dumps(CONTENT))
+
+        content = response.json()
+        content['items'].append(3)
+        content['name'] = 'john'
+
+        self.assertEqual(response.json(), CONTENT)
+
+    def test_json_async_mutation(self):
+        response = MockResponseAsync(200, json.dumps(CONTENT))
+
+        content = asyncio.run(response.json())
+        content['items'].append(3)
+        content['name'] = 'john'
+
+        self.assertEqual(asyncio.run(response.json()), CONTENT)
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from apitests.replay import (
+    dump_replay,
+    load_replay,
+)
+from apitests.stub import StubsData
+
+STUBS = {
+    'svc': {
+        'get#/items/{id}': {
+            '200-ok': {'id': 1},
+            '404-not_found': {},
+        },
+    },
+}
+
+
+class ReplayTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'test_autogen.replay.json')
+        self.tests_file = os.path.join(self.tmp.name, 'test_autogen.py')
+        self.stubs_file = os.path.join(self.tmp.name, 'apistubs.yaml')
+        for path in (self.tests_file, self.stubs_file):
+            with open(path, 'w') as source_file:
+                source_file.write('# %s\n' % path)
+
+        data = StubsData(STUBS)
+        self.tests = {'test_0_ok': {('svc', 'get', '/items/7'): '/items/{id}'}}
+        self.bodies = {
+            ('svc', 'get', '/items/{id}', key): data.get_body('svc', 'get', '/items/{id}', key)
+            for key in STUBS['svc']['get#/items/{id}']
+        }
+        dump_replay(self.path, self.tests, self.bodies, self.tests_file, self.stubs_file)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load(self):
+        return load_replay(self.path, self.tests_file, self.stubs_file)
+
+    def test_load(self):
+        replay = self.load()
+        self.assertEqual(list(replay), ['test_0_ok'])
+        self.assertEqual(replay['test_0_ok']['routes'], self.tests['test_0_ok'])
+        self.assertEqual(replay['test_0_ok']['bodies'], self.bodies)
+        self.assertEqual(replay['test_0_ok']['bodies'][('svc', 'get', '/items/{id}', '200-ok')], b'{"id": 1}')
+
+    def test_touched_files(self):
+        # checkout or copy changes mtime, not the content
+        os.utime(self.tests_file, (0, 0))
+        os.utime(self.stubs_file, (0, 0))
+        self.assertIsNotNone(self.load())
+
+    def test_changed_files(self):
+        for path in (self.tests_file, self.stubs_file):
+            with open(path, 'a') as source_file:
+                source_file.write('# changed\n')
+            self.assertIsNone(self.load())
+            dump_replay(self.path, self.tests, self.bodies, self.tests_file, self.stubs_file)
+            self.assertIsNotNone(self.load())
+
+    def test_broken_artifact(self):
+        for content in ('', '{"version": 2}', '[]', 'not json'):
+            with open(self.path, 'w') as replay_file:
+                replay_file.write(content)
+            self.assertIsNone(self.load())
+
+        os.remove(self.path)
+        self.assertIsNone(self.load())
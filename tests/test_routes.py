@@ -0,0 +1,77 @@
+import itertools
+import random
+import unittest
+
+from apitests.utils import (
+    RouteIndex,
+    path_depth,
+    search,
+    select_path,
+)
+
+
+def baseline_select_path(paths, path):
+    # linear scan, the reference ordering rules
+    max_path_size = 0
+    result = None
+    for path_pattern in paths:
+        if path_pattern == path:
+            return path_pattern
+
+        if search(path_pattern, path) and len(path_pattern) > max_path_size:
+            result = path_pattern
+            max_path_size = len(path_pattern)
+
+    return result
+
+
+class RouteIndexTestCase(unittest.TestCase):
+    def test_longest_match(self):
+        paths = ['/{a}/{b}', '/users/{id}', '/users/{user_id}']
+        self.assertEqual(select_path(paths, '/users/7'), '/users/{user_id}')
+
+    def test_first_declared_on_tie(self):
+        paths = ['/users/{id}', '/{k}/{id}', '/users/{pk}']
+        self.assertEqual(select_path(paths, '/users/7'), '/users/{id}')
+        self.assertEqual(select_path(list(reversed(paths)), '/users/7'), '/users/{pk}')
+
+    def test_exact_match(self):
+        paths = ['/users/{user_id}', '/users/me']
+        self.assertEqual(select_path(paths, '/users/me'), '/users/me')
+        self.assertEqual(select_path(paths, '/users/7'), '/users/{user_id}')
+
+    def test_depth_buckets(self):
+        index = RouteIndex(['/users/{id}', '/users/{id}/orders', '/'])
+        self.assertEqual(sorted(index.buckets), [1, 2, 3])
+        self.assertEqual(path_depth('/users/{id}/orders'), 3)
+
+        self.assertEqual(index.select('/users/7/orders'), '/users/{id}/orders')
+        self.assertEqual(index.select('/users/7'), '/users/{id}')
+        self.assertIsNone(index.select('/users/7/orders/1'))
+        self.assertIsNone(index.select('/users'))
+
+    def test_add_existing(self):
+        index = RouteIndex(['/users/{id}', '/users/{pk}'])
+        index.add('/users/{id}')
+        self.assertEqual(len(index), 2)
+        self.assertIn('/users/{pk}', index)
+        self.assertEqual(index.select('/users/7'), '/users/{id}')
+
+    def test_baseline(self):
+        segments = ['users', 'orders', '{id}', '{pk}', '{user_id}', 'me']
+        patterns = [
+            '/' + '/'.join(parts)
+            for size in (1, 2, 3)
+            for parts in itertools.product(segments, repeat=size)
+        ]
+        paths = [
+            '/' + '/'.join(parts)
+            for size in (1, 2, 3, 4)
+            for parts in itertools.product(['users', 'orders', 'me', '7'], repeat=size)
+        ]
+        rnd = random.Random(0)
+        for _ in range(10):
+            declared = rnd.sample(patterns, 30)
+            index = RouteIndex(declared)
+            for path in paths:
+                self.assertEqual(index.select(path), baseline_select_path(declared, path), (declared, path))
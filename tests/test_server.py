@@ -0,0 +1,91 @@
+import asyncio
+import http.client
+import os
+import threading
+import unittest
+
+import requests
+
+from apitests.server import (
+    CONTROL_PREFIX,
+    StubServer,
+)
+
+STUBS_PATH = os.path.join(os.path.dirname(__file__), 'apistubs.yaml')
+
+
+class StubServerTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubServer(STUBS_PATH, port=0)
+        cls.loop = asyncio.new_event_loop()
+        cls.loop.run_until_complete(cls.server.start())
+        cls.thread = threading.Thread(target=cls.loop.run_forever, daemon=True)
+        cls.thread.start()
+        cls.url = 'http://127.0.0.1:%s' % cls.server.port
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join()
+        cls.server.server.close()
+        cls.loop.run_until_complete(cls.server.server.wait_closed())
+        cls.loop.close()
+
+    def setUp(self):
+        self.session = requests.Session()
+
+    def tearDown(self):
+        self.session.delete(self.url + CONTROL_PREFIX + '/workflow')
+        self.session.put(self.url + CONTROL_PREFIX + '/aliases', json=[])
+        self.session.close()
+
+    def test_default_option(self):
+        response = self.session.get(self.url + '/first/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {})
+
+    def test_alias_header(self):
+        response = self.session.get(self.url + '/first/', headers={'X-Apitests-Alias': 'not_found'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_aliases(self):
+        self.assertEqual(self.session.put(self.url + CONTROL_PREFIX + '/aliases', json=['error']).status_code, 200)
+        for _ in range(2):
+            self.assertEqual(self.session.get(self.url + '/first/').status_code, 500)
+
+    def test_unknown_route(self):
+        self.assertEqual(self.session.get(self.url + '/first/missing').status_code, 404)
+        self.assertEqual(self.session.get(self.url + '/unknown/').status_code, 404)
+
+    def test_workflow(self):
+        response = self.session.put(self.url + CONTROL_PREFIX + '/workflow', json={
+            'points': [{'_service': 'second', 'method': 'get', 'path': '/', 'status': 201, 'content': {'id': 1}}],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['points']), 1)
+
+        response = self.session.get(self.url + '/second/')
+        self.assertEqual((response.status_code, response.json()), (201, {'id': 1}))
+        self.assertEqual(self.session.get(self.url + CONTROL_PREFIX + '/workflow').json()['points'], [])
+
+    def test_workflow_invalid(self):
+        control = self.url + CONTROL_PREFIX + '/workflow'
+        self.assertEqual(self.session.put(control, data='prompt=ok').status_code, 400)
+        self.assertEqual(self.session.put(control, json={'unknown': []}).status_code, 400)
+        self.assertEqual(self.session.put(control, json=['ok']).status_code, 400)
+        self.assertEqual(self.session.put(control, json={'points': [{'method': 'get'}]}).status_code, 400)
+        self.assertEqual(self.session.put(self.url + CONTROL_PREFIX + '/aliases', json={'ok': 1}).status_code, 400)
+        self.assertEqual(self.session.get(self.url + CONTROL_PREFIX + '/unknown').status_code, 404)
+
+    def test_keep_alive(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.server.port)
+        try:
+            for _ in range(3):
+                connection.request('GET', '/first/')
+                response = connection.getresponse()
+                self.assertEqual(response.status, 200)
+                self.assertEqual(response.read(), b'{}')
+                self.assertFalse(response.will_close)
+        finally:
+            connection.close()
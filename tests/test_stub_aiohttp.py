@@ -0,0 +1,80 @@
+import asyncio
+import unittest
+
+from apitests import points
+from apitests.stub import (
+    AIOHTTP_ENABLED,
+    Stubs,
+)
+
+STUBS = {
+    'svc': {
+        'get#/items/{id}': {
+            '200-ok': {'id': 1},
+            '404-not_found': {},
+        },
+        'post#/items': {
+            '201-ok': {'created': True},
+        },
+    },
+}
+
+
+@unittest.skipUnless(AIOHTTP_ENABLED, 'aiohttp is not installed')
+class AiohttpReplayTestCase(unittest.TestCase):
+    def setUp(self):
+        self.stubs = Stubs(data=STUBS, external_services={'svc.local': 'svc'})
+        self.stubs.is_gentests = False
+
+    def replay(self, workflow_points, coroutine):
+        workflow = points.Workflow(workflow_points)
+        with self.stubs.up(pipeline=workflow, prompt=[], test_case=self):
+            return asyncio.run(coroutine())
+
+    def test_get(self):
+        import aiohttp
+
+        async def call():
+            async with aiohttp.ClientSession() as session:
+                async with session.get('http://svc.local/items/7') as response:
+                    return response.status, await response.json()
+
+        status, content = self.replay([
+            points.PointExternalApi(
+                'svc', 'get', '/items/7', response_status=200, response_content={'id': 7}
+            ),
+        ], call)
+        self.assertEqual(status, 200)
+        self.assertEqual(content, {'id': 7})
+
+    def test_post_json(self):
+        import aiohttp
+
+        async def call():
+            async with aiohttp.ClientSession() as session:
+                async with session.post('http://svc.local/items', json={'x': 1}) as response:
+                    return response.status, await response.json()
+
+        status, content = self.replay([
+            points.PointExternalApi(
+                'svc', 'post', '/items', data={'x': 1},
+                response_status=201, response_content={'created': True}
+            ),
+        ], call)
+        self.assertEqual(status, 201)
+        self.assertEqual(content, {'created': True})
+
+    def test_post_json_mismatch(self):
+        import aiohttp
+
+        async def call():
+            async with aiohttp.ClientSession() as session:
+                async with session.post('http://svc.local/items', json={'x': 2}):
+                    pass
+
+        with self.assertRaises(AssertionError):
+            self.replay([
+                points.PointExternalApi(
+                    'svc', 'post', '/items', data={'x': 1}, response_status=201
+                ),
+            ], call)
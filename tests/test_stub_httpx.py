@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+
+from apitests import points
+from apitests.stub import (
+    HTTP_CORE_ENABLED,
+    Stubs,
+)
+
+STUBS = {
+    'svc': {
+        'get#/items/{id}': {
+            '200-ok': {'id': 1},
+        },
+        'post#/items': {
+            '201-ok': {'created': True},
+        },
+    },
+}
+
+
+@unittest.skipUnless(HTTP_CORE_ENABLED, 'httpx is not installed')
+class HttpxReplayTestCase(unittest.TestCase):
+    def setUp(self):
+        self.stubs = Stubs(data=STUBS, external_services={'svc.local': 'svc'})
+
+    def replay(self, workflow_points, coroutine):
+        workflow = points.Workflow(workflow_points)
+        with self.stubs.up(pipeline=workflow, prompt=[], test_case=self):
+            result = asyncio.run(coroutine())
+        self.assertFalse(workflow.has_uncalled_calls())
+        return result
+
+    def test_async_get(self):
+        import httpx
+
+        async def call():
+            async with httpx.AsyncClient() as client:
+                response = await client.get('http://svc.local/items/7')
+                return response.status_code, response.json()
+
+        status, content = self.replay([
+            points.PointExternalApi(
+                'svc', 'get', '/items/7', response_status=200, response_content={'id': 7}
+            ),
+        ], call)
+        self.assertEqual(status, 200)
+        self.assertEqual(content, {'id': 7})
+
+    def test_async_concurrent(self):
+        import httpx
+
+        async def call():
+            async with httpx.AsyncClient() as client:
+                responses = await asyncio.gather(
+                    client.get('http://svc.local/items/1'),
+                    client.post('http://svc.local/items', json={'x': 1}),
+                )
+                return [(response.status_code, response.json()) for response in responses]
+
+        results = self.replay([
+            points.PointExternalApi(
+                'svc', 'get', '/items/1', response_status=200, response_content={'id': 1}
+            ),
+            points.PointExternalApi(
+                'svc', 'post', '/items', data={'x': 1},
+                response_status=201, response_content={'created': True}
+            ),
+        ], call)
+        self.assertEqual(results, [(200, {'id': 1}), (201, {'created': True})])
+
+    def test_async_post_mismatch(self):
+        import httpx
+
+        async def call():
+            async with httpx.AsyncClient() as client:
+                await client.post('http://svc.local/items', json={'x': 2})
+
+        with self.assertRaises(AssertionError):
+            self.replay([
+                points.PointExternalApi(
+                    'svc', 'post', '/items', data={'x': 1}, response_status=201
+                ),
+            ], call)
+
+    def test_sync_get(self):
+        import httpx
+
+        async def call():
+            with httpx.Client() as client:
+                response = client.get('http://svc.local/items/3')
+                return response.status_code, response.json()
+
+        status, content = self.replay([
+            points.PointExternalApi(
+                'svc', 'get', '/items/3', response_status=200, response_content={'id': 3}
+            ),
+        ], call)
+        self.assertEqual(status, 200)
+        self.assertEqual(content, {'id': 3})
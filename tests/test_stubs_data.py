@@ -0,0 +1,36 @@
+import unittest
+
+import yaml
+
+from apitests.helpers import yaml_dumps
+from apitests.stub import (
+    Stubs,
+    StubsData,
+)
+from apitests.utils import YAMLDumper
+
+STUBS = {
+    'svc': {
+        'get#/items/{id}': {
+            '200-ok': {'id': 1},
+        },
+    },
+}
+
+
+class StubsDataTestCase(unittest.TestCase):
+    def test_pattern_data(self):
+        data = StubsData(STUBS)
+        self.assertEqual(
+            Stubs.get_pattern_data(data, 'svc', '/items/7', method='get'),
+            ('/items/{id}', STUBS['svc']['get#/items/{id}'])
+        )
+        self.assertIs(Stubs(data=STUBS).data.__class__, StubsData)
+
+    def test_yaml(self):
+        data = StubsData(STUBS)
+        self.assertEqual(yaml.safe_load(yaml_dumps(data)), STUBS)
+        # only `YAMLDumper` knows stubs data
+        self.assertNotIn(StubsData, yaml.Dumper.yaml_representers)
+        if YAMLDumper is not yaml.SafeDumper:
+            self.assertNotIn(StubsData, yaml.SafeDumper.yaml_representers)
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+from apitests.generator.stubgen import StubsGen
+from apitests.stub import (
+    StubsFileMixin,
+    StubsRegistry,
+    stubs_registry,
+)
+
+STUBS_YAML = """
+apistubs: 1.0.0
+svc:
+  get#/items:
+    200-ok: {}
+_draft:
+  get#/draft:
+    200-ok: {}
+"""
+
+
+class KeepDraftsStubs(StubsFileMixin):
+    @classmethod
+    def clear_nodes(cls, data, dep=0):
+        pass
+
+
+class StubsRegistryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'apistubs.yaml')
+        with open(self.path, 'w') as stubs_file:
+            stubs_file.write(STUBS_YAML)
+        stubs_registry.clear()
+
+    def tearDown(self):
+        stubs_registry.clear()
+        self.tmp.cleanup()
+
+    def test_shared_between_calls(self):
+        self.assertIs(StubsFileMixin.config(self.path), StubsFileMixin.config(self.path))
+
+    def test_subclasses_are_cached_separately(self):
+        data = StubsFileMixin.config(self.path)
+        data_drafts = KeepDraftsStubs.config(self.path)
+
+        self.assertNotIn('_draft', data)
+        self.assertIn('_draft', data_drafts)
+        self.assertIsNot(data, data_drafts)
+
+    def test_reloaded_on_change(self):
+        registry = StubsRegistry()
+        calls = []
+
+        def loader(path):
+            calls.append(path)
+            return len(calls)
+
+        self.assertEqual(registry.get(self.path, loader), 1)
+        self.assertEqual(registry.get(self.path, loader), 1)
+        with open(self.path, 'a') as stubs_file:
+            stubs_file.write('\n# changed\n')
+        self.assertEqual(registry.get(self.path, loader), 2)
+
+    def test_prefill_data_used(self):
+        data = StubsFileMixin.config(self.path)
+        stubs = StubsGen(data=data, initial_points=[None], contexts=[None], prefill_data_used=True)
+        stubs.data_used.add_options('svc', 'get#/generated', {'200-ok': {}})
+        stubs.data_used.add_options('other', 'get#/', {'200-ok': {}})
+
+        self.assertIs(StubsFileMixin.config(self.path), data)
+        self.assertEqual(list(data['svc']), ['get#/items'])
+        self.assertNotIn('other', data)
+        self.assertEqual(data.get_pattern_data('svc', '/generated', method='get'), (None, None))
@@ -0,0 +1,100 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from apitests import points
+from apitests.stub import Stubs
+
+STUBS = {
+    'svc': {
+        'get#/items/{id}': {
+            '200-ok': {'id': 0},
+        },
+    },
+}
+
+CLIENTS = 8
+
+
+class WorkflowConcurrencyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.stubs = Stubs(data=STUBS, external_services={'svc.local': 'svc'})
+        self.stubs.is_gentests = False
+
+    def get_workflow(self, ordering, count=CLIENTS):
+        return points.Workflow(
+            [
+                points.PointExternalApi(
+                    'svc', 'get', '/items/%s' % index,
+                    response_status=200, response_content={'id': index}
+                )
+                for index in range(count)
+            ],
+            ordering=ordering
+        )
+
+    def request_concurrently(self, workflow, ids):
+        # all clients hit the same route of one workflow at once
+        barrier = threading.Barrier(len(ids))
+
+        def call(index):
+            barrier.wait()
+            response = requests.get('http://svc.local/items/%s' % index)
+            return index, response.json()['id']
+
+        with self.stubs.up(pipeline=workflow, prompt=[], test_case=self):
+            with ThreadPoolExecutor(len(ids)) as executor:
+                return list(executor.map(call, ids))
+
+    def test_request_ordering(self):
+        workflow = self.get_workflow(points.Workflow.ORDERING_REQUEST)
+        results = self.request_concurrently(workflow, list(reversed(range(CLIENTS))))
+
+        for requested, received in results:
+            self.assertEqual(requested, received)
+        self.assertFalse(workflow.has_uncalled_calls())
+        self.assertEqual(workflow.uncalled_count, 0)
+
+    def test_fifo_ordering(self):
+        workflow = self.get_workflow(points.Workflow.ORDERING_FIFO)
+        results = self.request_concurrently(workflow, list(range(CLIENTS)))
+
+        # every point is served exactly once, whatever the arrival order
+        self.assertEqual(sorted(received for _, received in results), list(range(CLIENTS)))
+        self.assertFalse(workflow.has_uncalled_calls())
+        self.assertEqual(workflow.uncalled_count, 0)
+
+    def test_fifo_ignores_request(self):
+        workflow = self.get_workflow(points.Workflow.ORDERING_FIFO, count=2)
+        with self.stubs.up(pipeline=workflow, prompt=[], test_case=self):
+            self.assertEqual(requests.get('http://svc.local/items/1').json(), {'id': 0})
+            self.assertEqual(requests.get('http://svc.local/items/0').json(), {'id': 1})
+
+    def test_request_ordering_fallback(self):
+        # unmatched requests take points in order of arrival
+        workflow = self.get_workflow(points.Workflow.ORDERING_REQUEST, count=2)
+        with self.stubs.up(pipeline=workflow, prompt=[], test_case=self):
+            self.assertEqual(requests.get('http://svc.local/items/5').json(), {'id': 0})
+            self.assertEqual(requests.get('http://svc.local/items/1').json(), {'id': 1})
+
+    def test_get_reponse_concurrent(self):
+        workflow = self.get_workflow(points.Workflow.ORDERING_FIFO, count=CLIENTS * 4)
+        self.stubs.pipeline = workflow
+        self.stubs.index_pipeline()
+        barrier = threading.Barrier(CLIENTS)
+
+        def call(_):
+            barrier.wait()
+            return [
+                workflow.get_reponse('svc', 'get', '/items/{id}')[1]['id']
+                for _ in range(4)
+            ]
+
+        with ThreadPoolExecutor(CLIENTS) as executor:
+            received = sum(executor.map(call, range(CLIENTS)), [])
+
+        self.assertEqual(sorted(received), list(range(CLIENTS * 4)))
+        self.assertEqual(workflow.uncalled_count, 0)
+        self.assertEqual(workflow.get_reponse('svc', 'get', '/items/{id}'), (None, None, None))